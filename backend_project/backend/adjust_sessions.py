@@ -0,0 +1,90 @@
+import json
+import pickle
+import threading
+
+from django.conf import settings
+
+from src.adjust_dimension import AdjustSession
+from .result_cache import make_result_cache
+
+# adjust_dimension requests that carry a `sessionToken` keep the solved plan
+# between calls, so dragging one room only re-solves the dimensions that
+# changed. Configure with FLOORPLAN_ADJUST_SESSIONS in settings; it takes the
+# same options as FLOORPLAN_RESULT_CACHE, and None turns sessions off. Sessions
+# are stored pickled, so a solve always edits a private copy and a request that
+# fails leaves the stored session as it was.
+
+
+def _normalize(rooms):
+    # Plans as they arrive in a request: JSON lists and floats
+    return json.loads(json.dumps(rooms))
+
+
+class SessionLease:
+    """A session taken out of the store for one adjust call.
+
+    `finish(session)` stores the session the solve left behind. `finish(None)`,
+    for a request that failed or was turned away, puts back what was stored
+    before, unless another request has stored a session for the token since.
+    """
+
+    __slots__ = ('session', '_store', '_token', '_entry')
+
+    def __init__(self, store, token, session, entry):
+        self.session = session
+        self._store = store
+        self._token = token
+        self._entry = entry
+
+    def finish(self, session):
+        if session is not None:
+            self._store.put(self._token, session)
+        elif self._entry is not None:
+            self._store.restore(self._token, self._entry)
+
+
+class AdjustSessionStore:
+    """AdjustSessions by token, on top of a result cache backend."""
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    def take(self, token, canvas_coords=None):
+        """A SessionLease on the token's session, or on a new empty one.
+
+        The session is removed from the store until the lease is finished, so two
+        requests with the same token never edit one plan at once; the second
+        just starts over. It is only reused when the client sends back the plan
+        it was last given (or no plan at all); a plan edited on the canvas
+        starts over too.
+        """
+        entry = self._cache.pop(f'adjust-session:{token}')
+        if entry is not None:
+            session_bytes, rooms = entry
+            if canvas_coords is None or _normalize(canvas_coords) == rooms:
+                return SessionLease(self, token, pickle.loads(session_bytes), entry)
+        return SessionLease(self, token, AdjustSession(), entry)
+
+    def put(self, token, session):
+        entry = (pickle.dumps(session, protocol=pickle.HIGHEST_PROTOCOL), _normalize(session.rooms))
+        self._cache.set(f'adjust-session:{token}', entry)
+
+    def restore(self, token, entry):
+        self._cache.add(f'adjust-session:{token}', entry)
+
+
+_adjust_sessions = None
+_adjust_sessions_lock = threading.Lock()
+_adjust_sessions_loaded = False
+
+
+def get_adjust_sessions():
+    # None when sessions are turned off
+    global _adjust_sessions, _adjust_sessions_loaded
+    if not _adjust_sessions_loaded:
+        with _adjust_sessions_lock:
+            if not _adjust_sessions_loaded:
+                cache = make_result_cache(getattr(settings, 'FLOORPLAN_ADJUST_SESSIONS', {'BACKEND': 'local'}))
+                _adjust_sessions = AdjustSessionStore(cache) if cache is not None else None
+                _adjust_sessions_loaded = True
+    return _adjust_sessions
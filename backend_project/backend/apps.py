@@ -1,6 +1,21 @@
+import json
+
 from django.apps import AppConfig
 
 
 class BackendConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "backend"
+
+    def ready(self):
+        from .constraint_tables import constraint_tables
+        from .template_store import template_store
+
+        # A bad constraints config stops the server from starting
+        constraint_tables()
+
+        # Parse the templates at process start; a bad file is reported per request
+        try:
+            template_store.preload()
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
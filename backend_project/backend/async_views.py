@@ -0,0 +1,125 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+
+from src.metrics import collect_metrics, registry
+from .result_cache import get_result_cache
+from .solver_executor import SolverBusy, get_solver_executor, solve_add_room, solve_adjust, solve_generate
+from .views import _add_room_job, _adjust_job, _finish_adjust, _floorplan_job, _timings_headers
+
+# Async versions of the views in views.py for ASGI servers. They validate the
+# same way but hand the solve to the executor in solver_executor.py, so one
+# worker keeps answering other requests while solves run. When the executor is
+# full they answer 503 right away.
+
+
+def _response(data, status_code=status.HTTP_200_OK, headers=None):
+    # DRF's encoder, so responses match the sync views (NumPy values included)
+    response = JsonResponse(data, status=status_code, encoder=JSONEncoder, safe=False, headers=headers)
+    if status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
+        response['Retry-After'] = '1'
+    return response
+
+
+def _busy():
+    return _response({'error': 'The server is busy, try again shortly.'}, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+def _cached_result(cache_key):
+    result_cache = get_result_cache()
+    return result_cache.get(cache_key) if result_cache is not None else None
+
+
+def _cache_result(cache_key, response_data):
+    result_cache = get_result_cache()
+    if result_cache is not None:
+        result_cache.set(cache_key, response_data)
+
+
+@csrf_exempt
+@require_POST
+async def generate_floorplan_async(request):
+    try:
+        data = json.loads(request.body)
+
+        with collect_metrics() as metrics:
+            # Cache backends may touch the database, so they run off the event loop
+            job, cache_key, precomputed, error = await sync_to_async(_floorplan_job)(data)
+            if error:
+                return _response({'error': error[0]}, error[1])
+            if precomputed is not None:
+                response_data, source = precomputed, 'precomputed'
+            else:
+                response_data, source = await sync_to_async(_cached_result)(cache_key), 'cache'
+            if response_data is None:
+                response_data, solve_metrics = await get_solver_executor().run(solve_generate, *job)
+                metrics.merge(solve_metrics)
+                source = 'solver'
+                await sync_to_async(_cache_result)(cache_key, response_data)
+        registry.record('generate', source, metrics)
+        return _response(response_data, headers=_timings_headers(data, source, metrics))
+    except SolverBusy:
+        return _busy()
+    except Exception as e:
+        return _response({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+
+
+@csrf_exempt
+@require_POST
+async def adjust_dimension_async(request):
+    try:
+        data = json.loads(request.body)
+
+        with collect_metrics() as metrics:
+            args, lease, error = await sync_to_async(_adjust_job)(data)
+            if error:
+                return _response({'error': error[0]}, error[1])
+            session = lease.session if lease is not None else None
+            source = 'session' if session is not None and session.is_warm(args[3]) else 'solver'
+
+            # A failed or refused solve (SolverBusy) puts the old session back
+            solved = None
+            try:
+                (response_data, solved), solve_metrics = await get_solver_executor().run(solve_adjust, *args, session)
+            finally:
+                await sync_to_async(_finish_adjust)(lease, solved)
+            metrics.merge(solve_metrics)
+        registry.record('adjust', source, metrics)
+        return _response(response_data, headers=_timings_headers(data, source, metrics))
+    except SolverBusy:
+        return _busy()
+    except Exception as e:
+        return _response({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+
+
+@csrf_exempt
+@require_POST
+async def add_new_room_async(request):
+    try:
+        data = json.loads(request.body)
+
+        with collect_metrics() as metrics:
+            args, error = _add_room_job(data)
+            if error:
+                return _response({'error': error[0]}, error[1])
+
+            response_data, solve_metrics = await get_solver_executor().run(solve_add_room, *args)
+            metrics.merge(solve_metrics)
+        registry.record('add_room', 'solver', metrics)
+        return _response(response_data, headers=_timings_headers(data, 'solver', metrics))
+    except SolverBusy:
+        return _busy()
+    except Exception as e:
+        return _response({'error': str(e)}, status.HTTP_400_BAD_REQUEST)
+
+
+@require_GET
+async def health_async(request):
+    # Never touches the solver, so it answers even while every worker is busy
+    executor = get_solver_executor()
+    return _response({'status': 'ok', 'pendingSolves': executor.pending, 'maxPendingSolves': executor.max_pending})
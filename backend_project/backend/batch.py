@@ -0,0 +1,70 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from src.metrics import registry
+
+# Worker processes for /api/generate_floorplan_batch/. The pool is started on the
+# first batch request and kept alive, so every later batch reuses warm workers.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _warm_worker():
+    # Import the engine once per worker instead of once per job
+    import src.test_area  # noqa: F401
+
+
+def _generate(job):
+    from src.metrics import collect_metrics
+    from src.test_area import generate_floorplan_main
+
+    # (template_coords, flat_type, flat_area[, constraints[, area_solver]])
+    with collect_metrics() as metrics:
+        try:
+            result = generate_floorplan_main(*job)
+        except Exception as e:
+            result = {'error': str(e)}
+    # The stage metrics travel back so the parent process can report them
+    return result, metrics
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = getattr(settings, 'FLOORPLAN_BATCH_WORKERS', None) or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker)
+        return _pool
+
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_batch(jobs):
+    """Run (template_coords, flat_type, flat_area[, constraints[, area_solver]]) jobs across the worker pool.
+
+    Results come back in the order of `jobs`. A job that raises gives an
+    {'error': ...} entry instead of failing the whole batch.
+    """
+    if not jobs:
+        return []
+    pool = get_pool()
+    try:
+        results = []
+        for result, metrics in pool.map(_generate, jobs):
+            registry.record('generate', 'solver', metrics)
+            results.append(result)
+        return results
+    except BrokenProcessPool:
+        # A worker died (e.g. killed by the OS); start a fresh pool for the next batch
+        _reset_pool(pool)
+        raise
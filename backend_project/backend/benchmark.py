@@ -0,0 +1,233 @@
+import copy
+import gc
+import platform
+import statistics
+import sys
+import tracemalloc
+
+import numpy as np
+
+from src.adjust_dimension import adjust_dimension_main
+from src.metrics import collect_metrics
+from src.new_room_placement import add_new_room_main
+from src.synthetic_plans import plan_area, synthetic_floor
+from src.test_area import generate_floorplan_main
+
+# Benchmark harness behind `manage.py benchmark_floorplans`. Every case runs one
+# engine entry point on fresh copies of its inputs. It is timed over `repeat`
+# runs, with the per-stage timers and counters of metrics.py, and then run once
+# more under tracemalloc for memory. The result is a JSON-serialisable baseline
+# that a later run can be compared against.
+
+BASELINE_VERSION = 1
+
+# Area sweeps per flat type; the lower ends are the smallest areas the engine accepts
+DEFAULT_AREAS = {
+    '1BHK': (300, 450, 600, 900),
+    '2BHK': (525, 700, 900, 1200),
+}
+
+ADD_ROOM_DIRECTIONS = ('Top', 'Bottom', 'Left', 'Right')
+
+# Synthetic floors are generated at these multiples of the area they are drawn at
+SYNTHETIC_AREA_FACTORS = (1.0, 1.25)
+
+
+class BenchmarkCase:
+    """One engine call to measure: `args()` builds fresh arguments for every run."""
+
+    __slots__ = ('endpoint', 'name', 'params', 'fn', 'args')
+
+    def __init__(self, endpoint, name, params, fn, args):
+        self.endpoint = endpoint
+        self.name = name
+        self.params = params
+        self.fn = fn
+        self.args = args
+
+    @property
+    def key(self):
+        return f'{self.endpoint}|{self.name}'
+
+
+def scale_plan(rooms, factor):
+    # The same plan with every coordinate multiplied by `factor` (area by factor**2)
+    return {
+        room: [[[x * factor, y * factor] for x, y in wall] for wall in walls]
+        for room, walls in rooms.items()
+    }
+
+
+def _room_width(walls):
+    xs = [x for wall in walls for x, y in wall]
+    return max(xs) - min(xs)
+
+
+def plan_cases(name, flat_type, rooms, areas, scale=1, area_solver='heuristic'):
+    """Cases for all three endpoints on one plan.
+
+    generate_floorplan runs over `areas` (multiplied by scale**2 for scaled
+    plans), adjust_dimension widens the first room by 10% and add_new_room
+    places a study on each side of it. The first two use `area_solver`.
+    """
+    first_room = next(iter(rooms))
+    params = {'template': name, 'type': flat_type, 'rooms': len(rooms), 'scale': scale}
+    solver_params = {**params, 'areaSolver': area_solver}
+    cases = []
+    for area in areas:
+        flat_area = area * scale ** 2
+        cases.append(BenchmarkCase(
+            'generate', f'{name}|area={flat_area}', {**solver_params, 'flatArea': flat_area},
+            generate_floorplan_main, lambda flat_area=flat_area: (copy.deepcopy(rooms), flat_type, flat_area, None, area_solver),
+        ))
+
+    width = round(_room_width(rooms[first_room]) * 1.1, 2)
+    dimensions = {first_room: {'width': width, 'height': 0}}
+    cases.append(BenchmarkCase(
+        'adjust', f'{name}|{first_room} width={width}', {**solver_params, 'room': first_room, 'width': width},
+        adjust_dimension_main, lambda: (copy.deepcopy(rooms), copy.deepcopy(dimensions), 'Yes', None, area_solver),
+    ))
+
+    for direction in ADD_ROOM_DIRECTIONS:
+        cases.append(BenchmarkCase(
+            'add_room', f'{name}|{direction}', {**params, 'adjacentRoom': first_room, 'direction': direction},
+            add_new_room_main, lambda direction=direction: (copy.deepcopy(rooms), 'Study', 8 * scale, 6 * scale, first_room, direction),
+        ))
+    return cases
+
+
+def template_cases(templates, areas=None, scales=(1,), area_solver='heuristic'):
+    # `templates` is {flat_type: {template_number: rooms}}, as in converted_coordinates.json
+    areas = areas or DEFAULT_AREAS
+    cases = []
+    for scale in scales:
+        for flat_type, flat_templates in templates.items():
+            for template_number, rooms in flat_templates.items():
+                name = f'{flat_type}_{template_number}' + (f'x{scale:g}' if scale != 1 else '')
+                plan = scale_plan(rooms, scale) if scale != 1 else rooms
+                cases.extend(plan_cases(name, flat_type, plan, areas.get(flat_type, ()), scale, area_solver))
+    return cases
+
+
+def synthetic_cases(templates, flat_counts, jitter=0.1, seed=0, area_solver='heuristic'):
+    """Cases for whole floors of 1BHK/2BHK flats tiled by synthetic_plans.
+
+    generate_floorplan gets '2BHK' as the flat type, which only sets the
+    smallest area it accepts, far below the area of a whole floor.
+    """
+    plans = [rooms for flat_templates in templates.values() for rooms in flat_templates.values()]
+    cases = []
+    for flats in flat_counts:
+        floor = synthetic_floor(plans, flats, jitter=jitter, seed=seed)
+        area = plan_area(floor)
+        areas = [round(area * factor, 2) for factor in SYNTHETIC_AREA_FACTORS]
+        name = f'synthetic_{flats}flats_seed{seed}'
+        cases.extend(plan_cases(name, '2BHK', floor, areas, area_solver=area_solver))
+    return cases
+
+
+def _call(case):
+    try:
+        case.fn(*case.args())
+        return None
+    except (Exception, SystemExit) as e:
+        # add_new_room_main exits when there is no room to place the new one
+        return f'{type(e).__name__}: {e}'
+
+
+def run_case(case, repeat=5, warmup=1):
+    """Latency, stage times, counters and memory of one case as a plain dict.
+
+    Python does not count the allocations it makes, so memory is reported as
+    the tracemalloc peak, the blocks still allocated after the call and the
+    garbage collections per run.
+    """
+    for _ in range(warmup):
+        _call(case)
+
+    latencies = []
+    stages = {}
+    counters = None
+    gc_before = sum(stats['collections'] for stats in gc.get_stats())
+    for _ in range(repeat):
+        with collect_metrics() as metrics:
+            error = _call(case)
+        latencies.append(metrics.elapsed * 1000)
+        for stage, (calls, seconds) in metrics.stages.items():
+            stages.setdefault(stage, []).append(seconds * 1000)
+        counters = metrics.counters
+    gc_collections = sum(stats['collections'] for stats in gc.get_stats()) - gc_before
+
+    # One more run for memory; tracemalloc slows everything down, so it is not timed
+    args = case.args()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        case.fn(*args)
+    except (Exception, SystemExit):
+        pass
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    net_blocks = sys.getallocatedblocks() - blocks_before
+
+    return {
+        'endpoint': case.endpoint,
+        'name': case.name,
+        'params': case.params,
+        'error': error,
+        'latency_ms': {
+            'min': round(min(latencies), 4),
+            'median': round(statistics.median(latencies), 4),
+            'mean': round(statistics.fmean(latencies), 4),
+            'max': round(max(latencies), 4),
+        },
+        'stages_ms': {stage: round(statistics.median(values), 4) for stage, values in stages.items()},
+        'counters': counters,
+        'peak_memory_bytes': peak_bytes,
+        'net_allocated_blocks': net_blocks,
+        'gc_collections_per_run': round(gc_collections / repeat, 2),
+    }
+
+
+def run_benchmark(cases, repeat=5, warmup=1, progress=None):
+    results = []
+    for i, case in enumerate(cases):
+        results.append(run_case(case, repeat, warmup))
+        if progress is not None:
+            progress(i + 1, len(cases), case, results[-1])
+    return {
+        'version': BASELINE_VERSION,
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+        },
+        'repeat': repeat,
+        'cases': {case.key: result for case, result in zip(cases, results)},
+    }
+
+
+def compare(baseline, current, threshold=0.10):
+    """Rows of (key, baseline ms, current ms, ratio, status) for cases in both runs.
+
+    Medians are compared; status is 'slower' or 'faster' when the ratio moves
+    more than `threshold` away from 1, else 'same'.
+    """
+    rows = []
+    for key, result in current['cases'].items():
+        previous = baseline['cases'].get(key)
+        if previous is None:
+            continue
+        before = previous['latency_ms']['median']
+        after = result['latency_ms']['median']
+        ratio = after / before if before else float('inf')
+        if ratio > 1 + threshold:
+            status = 'slower'
+        elif ratio < 1 - threshold:
+            status = 'faster'
+        else:
+            status = 'same'
+        rows.append((key, before, after, ratio, status))
+    return rows
@@ -0,0 +1,31 @@
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from src.constraints import DEFAULT_CONSTRAINTS_PATH, ConstraintConfigError, compile_all, load_constraints_config
+
+# Compiled constraint tables of the config file in FLOORPLAN_CONSTRAINTS_PATH,
+# one shared table and one per tenant. The file is read and validated once, at
+# startup (see apps.py); requests choose a tenant with "tenant" and get the
+# shared table without one.
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def constraint_tables():
+    global _tables
+    with _tables_lock:
+        if _tables is None:
+            path = getattr(settings, 'FLOORPLAN_CONSTRAINTS_PATH', None) or DEFAULT_CONSTRAINTS_PATH
+            try:
+                _tables = compile_all(load_constraints_config(path))
+            except (OSError, ConstraintConfigError) as e:
+                raise ImproperlyConfigured(f"Bad FLOORPLAN_CONSTRAINTS_PATH {path}: {e}") from e
+        return _tables
+
+
+def get_constraint_table(tenant=None):
+    # Raises KeyError for an unknown tenant
+    return constraint_tables()[tenant]
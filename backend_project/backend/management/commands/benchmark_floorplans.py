@@ -0,0 +1,89 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.benchmark import DEFAULT_AREAS, compare, run_benchmark, synthetic_cases, template_cases
+from backend.template_store import template_store
+from src.area_solver import AREA_SOLVERS
+
+
+class Command(BaseCommand):
+    help = "Time generate_floorplan, adjust_dimension and add_new_room on every template and write a JSON baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Write the baseline to this JSON file.")
+        parser.add_argument('--compare', help="Compare against an earlier baseline file.")
+        parser.add_argument('--threshold', type=float, default=0.10, help="Median change reported as slower/faster (default 0.10).")
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per case.")
+        parser.add_argument('--warmup', type=int, default=1, help="Untimed runs per case before timing.")
+        parser.add_argument('--endpoint', action='append', choices=['generate', 'adjust', 'add_room'], help="Only these endpoints (repeatable).")
+        parser.add_argument('--template', action='append', help="Only these templates, e.g. 1BHK/template3 (repeatable).")
+        parser.add_argument('--areas', help="Areas for generate_floorplan, e.g. '1BHK=300,600;2BHK=525,900'.")
+        parser.add_argument('--scale', type=float, action='append', help="Also run the templates scaled by this factor (repeatable).")
+        parser.add_argument('--synthetic', type=int, action='append', help="Also run a synthetic floor of this many flats (repeatable).")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed of the synthetic floors.")
+        parser.add_argument('--jitter', type=float, default=0.1, help="How much each flat of a synthetic floor is stretched (default 0.1).")
+        parser.add_argument('--area-solver', choices=AREA_SOLVERS, default='heuristic', help="Area distribution of generate and adjust (default heuristic).")
+
+    def _parse_areas(self, value):
+        if not value:
+            return DEFAULT_AREAS
+        areas = {}
+        try:
+            for part in value.split(';'):
+                flat_type, values = part.split('=')
+                areas[flat_type.strip()] = tuple(float(area) for area in values.split(','))
+        except ValueError:
+            raise CommandError(f"Bad --areas value: {value!r}")
+        return areas
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        templates = {}
+        for type_key, flat_templates in template_store.templates().items():
+            for template_number in flat_templates:
+                if options['template'] and f'{type_key}/{template_number}' not in options['template']:
+                    continue
+                templates.setdefault(type_key, {})[template_number] = template_store.get(type_key, template_number)
+        if not templates:
+            raise CommandError("No template matches --template.")
+
+        scales = [1] + [scale for scale in options['scale'] or () if scale != 1]
+        cases = template_cases(templates, self._parse_areas(options['areas']), scales, options['area_solver'])
+        if options['synthetic']:
+            if any(flats < 1 for flats in options['synthetic']):
+                raise CommandError("--synthetic needs at least one flat.")
+            cases += synthetic_cases(templates, options['synthetic'], options['jitter'], options['seed'], options['area_solver'])
+        if options['endpoint']:
+            cases = [case for case in cases if case.endpoint in options['endpoint']]
+
+        def progress(done, total, case, result):
+            status = result['error'] or 'ok'
+            self.stdout.write(f"[{done}/{total}] {case.key}: {result['latency_ms']['median']:.2f} ms, "
+                              f"peak {result['peak_memory_bytes'] / 1024:.0f} KiB ({status})")
+
+        report = run_benchmark(cases, options['repeat'], options['warmup'], progress)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Wrote {len(report['cases'])} cases to {options['output']}."))
+
+        if baseline is not None:
+            rows = compare(baseline, report, options['threshold'])
+            for key, before, after, ratio, status in rows:
+                line = f"{key}: {before:.2f} -> {after:.2f} ms (x{ratio:.2f})"
+                if status == 'slower':
+                    self.stdout.write(self.style.WARNING(line))
+                elif status == 'faster':
+                    self.stdout.write(self.style.SUCCESS(line))
+                else:
+                    self.stdout.write(line)
+            slower = sum(1 for row in rows if row[4] == 'slower')
+            self.stdout.write(f"{len(rows)} cases compared, {slower} slower than the baseline.")
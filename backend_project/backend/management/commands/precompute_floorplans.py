@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.batch import run_batch
+from backend.constraint_tables import get_constraint_table
+from backend.precomputed import walls_to_rooms, write_artifact
+from backend.template_store import template_store
+from src.area_solver import AREA_SOLVERS
+
+
+class Command(BaseCommand):
+    help = "Solve every template over a grid of flat areas and store the plans for generate_floorplan."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=float, default=300, help="Smallest area of the grid.")
+        parser.add_argument('--stop', type=float, default=1500, help="Largest area of the grid (inclusive).")
+        parser.add_argument('--step', type=float, default=25, help="Spacing of the grid.")
+        parser.add_argument('--area-solver', choices=AREA_SOLVERS, default=getattr(settings, 'FLOORPLAN_AREA_SOLVER', 'heuristic'),
+                            help="Area solver the plans are solved with.")
+        parser.add_argument('--output', default=getattr(settings, 'FLOORPLAN_PRECOMPUTED_PATH', None), help="Artifact path.")
+
+    def handle(self, *args, **options):
+        start, stop, step, output = options['start'], options['stop'], options['step'], options['output']
+        area_solver = options['area_solver']
+        if not output:
+            raise CommandError("No output path; pass --output or set FLOORPLAN_PRECOMPUTED_PATH.")
+        if step <= 0 or stop < start:
+            raise CommandError("The grid needs step > 0 and stop >= start.")
+
+        areas = []
+        area = start
+        while area <= stop + 1e-9:
+            areas.append(round(area, 6))
+            area += step
+
+        # The plans are served to requests whose constraints have the shared table's digest
+        constraints = get_constraint_table()
+        jobs = []
+        keys = []
+        for type_key, templates in template_store.templates().items():
+            for template_number in templates:
+                template_coords, content_hash = template_store.get_with_hash(type_key, template_number)
+                for area in areas:
+                    jobs.append((template_coords, type_key, area, constraints, area_solver))
+                    keys.append((type_key, template_number, content_hash, area))
+
+        self.stdout.write(f"Solving {len(jobs)} plans ({len(keys) // len(areas)} templates x {len(areas)} areas)...")
+        results = run_batch(jobs)
+
+        plans = []
+        failed = 0
+        for key, result in zip(keys, results):
+            if 'error' in result:
+                failed += 1
+                continue
+            plans.append(key + (walls_to_rooms(result),))
+
+        write_artifact(output, plans, {'start': start, 'stop': stop, 'step': step}, constraints.digest, area_solver)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(plans)} plans to {output} ({failed} failed)."))
@@ -0,0 +1,139 @@
+import bisect
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+from django.conf import settings
+
+# Floor plans solved ahead of time by `manage.py precompute_floorplans` for every
+# template over a grid of areas. The artifact is a compressed .npz holding one
+# float64 array with the wall coordinates of every plan and a JSON header that
+# says which slice belongs to which (flat type, template, area), and which
+# constraint table and area solver the plans were solved with.
+
+ARTIFACT_VERSION = 2
+
+
+def walls_to_rooms(wall_segments):
+    # Inverse of convert_all_rooms_to_walls: {room: [[[x, y], [x, y]], ...]}
+    return {
+        room: [[[wall['start']['x'], wall['start']['y']], [wall['end']['x'], wall['end']['y']]] for wall in walls]
+        for room, walls in wall_segments.items()
+    }
+
+
+def write_artifact(path, plans, grid, constraints_digest, area_solver):
+    """Write `plans` to `path`.
+
+    Each plan is (type_key, template_number, content_hash, area, rooms); `rooms` is
+    {} when the area is too small for the flat type. `constraints_digest` and
+    `area_solver` say how the plans were solved.
+    """
+    header = {
+        'version': ARTIFACT_VERSION,
+        'grid': grid,
+        'constraints': constraints_digest,
+        'area_solver': area_solver,
+        'plans': [],
+    }
+    coords = []
+    for type_key, template_number, content_hash, area, rooms in plans:
+        header['plans'].append({
+            'type': type_key,
+            'template': template_number,
+            'hash': content_hash,
+            'area': float(area),
+            'offset': len(coords),
+            'rooms': [[room, len(walls)] for room, walls in rooms.items()],
+        })
+        for walls in rooms.values():
+            for (x1, y1), (x2, y2) in walls:
+                coords.extend((x1, y1, x2, y2))
+
+    encoded_header = np.frombuffer(json.dumps(header).encode(), dtype=np.uint8)
+    with open(path, 'wb') as f:
+        np.savez_compressed(f, header=encoded_header, coords=np.array(coords, dtype=np.float64))
+
+
+class PrecomputedPlans:
+    """Lookup over a precomputed artifact.
+
+    Plans are only used while their template's content hash still matches the
+    template in use, so editing converted_coordinates.json never serves a stale plan.
+    `matches` tells whether the plans were solved the way a request would be, so
+    editing the constraints config does not serve them either.
+    """
+
+    def __init__(self, path):
+        with np.load(path) as artifact:
+            header_bytes = artifact['header'].tobytes()
+            self._coords = artifact['coords']
+        header = json.loads(header_bytes)
+        if header.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported precomputed artifact version: {header.get('version')!r}")
+        self.grid = header['grid']
+        self.constraints_digest = header['constraints']
+        self.area_solver = header['area_solver']
+        self.digest = hashlib.sha256(header_bytes).hexdigest()[:16]
+
+        # (type_key, template_number, content_hash) -> (sorted areas, plan entries)
+        self._plans = {}
+        for plan in header['plans']:
+            key = (plan['type'], plan['template'], plan['hash'])
+            self._plans.setdefault(key, []).append(plan)
+        for key, plans in self._plans.items():
+            plans.sort(key=lambda plan: plan['area'])
+            self._plans[key] = ([plan['area'] for plan in plans], plans)
+
+    def matches(self, constraints, area_solver):
+        # Whether the plans were solved with this constraint table and area solver
+        return self.constraints_digest == constraints.digest and self.area_solver == area_solver
+
+    def _rooms(self, plan):
+        rooms = {}
+        position = plan['offset']
+        for room, wall_count in plan['rooms']:
+            values = self._coords[position:position + wall_count * 4].tolist()
+            rooms[room] = [[[values[i], values[i + 1]], [values[i + 2], values[i + 3]]] for i in range(0, len(values), 4)]
+            position += wall_count * 4
+        return rooms
+
+    def exact(self, type_key, template_number, content_hash, flat_area):
+        # Solved plan for exactly this area, or None
+        areas, plans = self._plans.get((type_key, template_number, content_hash), ((), ()))
+        i = bisect.bisect_left(areas, flat_area)
+        if i < len(areas) and areas[i] == flat_area:
+            return self._rooms(plans[i])
+        return None
+
+    def nearest(self, type_key, template_number, content_hash, flat_area, max_distance):
+        # Solved plan for the closest grid area within `max_distance`, or None
+        areas, plans = self._plans.get((type_key, template_number, content_hash), ((), ()))
+        i = bisect.bisect_left(areas, flat_area)
+        candidates = [j for j in (i - 1, i) if 0 <= j < len(areas) and plans[j]['rooms']]
+        if not candidates:
+            return None
+        j = min(candidates, key=lambda j: abs(areas[j] - flat_area))
+        if abs(areas[j] - flat_area) > max_distance:
+            return None
+        return self._rooms(plans[j])
+
+
+_precomputed = None
+_precomputed_lock = threading.Lock()
+_precomputed_loaded = False
+
+
+def get_precomputed_plans():
+    # Loaded on first use; None when no artifact is configured or it has not been built
+    global _precomputed, _precomputed_loaded
+    if not _precomputed_loaded:
+        with _precomputed_lock:
+            if not _precomputed_loaded:
+                path = getattr(settings, 'FLOORPLAN_PRECOMPUTED_PATH', None)
+                if path and os.path.exists(path):
+                    _precomputed = PrecomputedPlans(path)
+                _precomputed_loaded = True
+    return _precomputed
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+# generate_floorplan is deterministic for a given template and area, so its
+# responses are cached. Configure with FLOORPLAN_RESULT_CACHE in settings:
+#   {'BACKEND': 'local', 'MAX_ENTRIES': 256, 'TTL': 3600}  in-process LRU (default)
+#   {'BACKEND': 'django', 'ALIAS': 'floorplans', 'TTL': 3600}  a Django cache, e.g.
+#       FileBasedCache or DatabaseCache on the SQLite database
+#   None  no caching
+
+
+class LocalResultCache:
+    """Thread-safe in-process LRU with a size bound and a time-to-live.
+
+    Values are handed back as stored, so callers must not modify them.
+    """
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if self.ttl is not None and expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def pop(self, key):
+        # Remove and return the value, so only one caller ever holds it
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        expires, value = entry
+        if self.ttl is not None and expires < time.monotonic():
+            return None
+        return value
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._set(key, expires, value)
+
+    def add(self, key, value):
+        # Set the value unless the key holds one already; returns whether it was set
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] >= time.monotonic()):
+                return False
+            self._set(key, expires, value)
+            return True
+
+    def _set(self, key, expires, value):
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Seconds a pop() claim outlives a caller that died while holding it
+_CLAIM_TIMEOUT = 10
+
+
+class DjangoResultCache:
+    """Results stored in one of the caches configured in CACHES."""
+
+    def __init__(self, alias='default', ttl=3600):
+        from django.core.cache import caches
+
+        self._cache = caches[alias]
+        self.ttl = ttl
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def pop(self, key):
+        # A get and a delete are two cache calls, so the caller first claims the
+        # key with add(); a racing caller finds the claim and gets None
+        claim = f'{key}:claim'
+        if not self._cache.add(claim, True, timeout=_CLAIM_TIMEOUT):
+            return None
+        try:
+            value = self._cache.get(key)
+            if value is not None:
+                self._cache.delete(key)
+            return value
+        finally:
+            self._cache.delete(claim)
+
+    def set(self, key, value):
+        self._cache.set(key, value, timeout=self.ttl)
+
+    def add(self, key, value):
+        return self._cache.add(key, value, timeout=self.ttl)
+
+    def clear(self):
+        self._cache.clear()
+
+
+def make_result_cache(config):
+    if not config:
+        return None
+    backend = config.get('BACKEND', 'local')
+    if backend == 'local':
+        return LocalResultCache(config.get('MAX_ENTRIES', 256), config.get('TTL', 3600))
+    if backend == 'django':
+        return DjangoResultCache(config.get('ALIAS', 'default'), config.get('TTL', 3600))
+    raise ValueError(f"Unknown FLOORPLAN_RESULT_CACHE backend: {backend!r}")
+
+
+def floorplan_cache_key(template, flat_type, flat_area, content_hash):
+    # 450 and 450.0 give the same plan, so numeric areas are compared as floats
+    if isinstance(flat_area, (int, float)) and not isinstance(flat_area, bool):
+        flat_area = float(flat_area)
+    request = json.dumps({'template': template, 'type': flat_type, 'flatArea': flat_area}, sort_keys=True)
+    return 'floorplan:' + hashlib.sha256(f'{request}:{content_hash}'.encode()).hexdigest()
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+_result_cache_loaded = False
+
+
+def get_result_cache():
+    # Built on first use so settings are read after Django has configured them
+    global _result_cache, _result_cache_loaded
+    if not _result_cache_loaded:
+        with _result_cache_lock:
+            if not _result_cache_loaded:
+                config = getattr(settings, 'FLOORPLAN_RESULT_CACHE', {'BACKEND': 'local'})
+                _result_cache = make_result_cache(config)
+                _result_cache_loaded = True
+    return _result_cache
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from src.metrics import collect_metrics
+
+# Executor behind the async views in async_views.py. Solves run in worker
+# processes (or threads) while the event loop keeps serving other requests, and
+# at most MAX_PENDING solves may be running or queued at once; past that a
+# request is turned away with 503 at once instead of waiting in line.
+# Configure with FLOORPLAN_ASYNC_EXECUTOR in settings:
+#   {'KIND': 'process', 'WORKERS': None, 'MAX_PENDING': 32}
+# WORKERS defaults to the number of CPUs.
+
+
+class SolverBusy(Exception):
+    pass
+
+
+def _warm_worker():
+    # Import the engines once per worker instead of once per job
+    import src.adjust_dimension  # noqa: F401
+    import src.new_room_placement  # noqa: F401
+    import src.test_area  # noqa: F401
+
+
+# Jobs run in the workers. They take and return plain data so the process
+# executor can pickle them.
+
+def solve_generate(template_coords, flat_type, flat_area, constraints=None, area_solver='heuristic'):
+    from src.test_area import generate_floorplan_main
+
+    return generate_floorplan_main(template_coords, flat_type, flat_area, constraints, area_solver)
+
+
+def solve_adjust(canvas_coords, fixed_dimension, freeze, constraints, area_solver, session):
+    # The session is edited in the worker, so it travels back with the plan
+    from src.adjust_dimension import adjust_dimension_main
+
+    return adjust_dimension_main(canvas_coords, fixed_dimension, freeze, constraints, area_solver, session), session
+
+
+def solve_add_room(coordinates, room_name, room_width, room_height, adjacent_room, direction):
+    from src.new_room_placement import add_new_room_main
+
+    return add_new_room_main(coordinates, room_name, room_width, room_height, adjacent_room, direction)
+
+
+def _measured(fn, *args):
+    # The worker's stage metrics go back with the result. Some dead ends of the
+    # engines still end in sys.exit(); the SystemExit would come back through the
+    # future and stop the event loop awaiting it, so it is sent back as an error
+    with collect_metrics() as metrics:
+        try:
+            result = fn(*args)
+        except SystemExit as e:
+            raise ValueError(str(e.code)) from None
+    return result, metrics
+
+
+class SolverExecutor:
+    """A process or thread pool with a bound on the solves in flight."""
+
+    def __init__(self, kind='process', max_workers=None, max_pending=32):
+        if kind not in ('process', 'thread'):
+            raise ValueError(f"Unknown FLOORPLAN_ASYNC_EXECUTOR kind: {kind!r}")
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_worker)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='solver')
+            return self._executor
+
+    def _reset(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, fn, *args):
+        """Run fn(*args) on the pool and return (result, StageMetrics of the solve).
+
+        Raises SolverBusy when the queue is full.
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise SolverBusy()
+            self.pending += 1
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_measured, fn, *args)
+        except BaseException:
+            self._release(None)
+            raise
+        # A solve keeps its slot until it really finishes, even when the client
+        # goes away and the awaiting request is cancelled
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wrap_future(future)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed by the OS); start a fresh pool for the next solve
+            self._reset(executor)
+            raise
+
+
+_solver_executor = None
+_solver_executor_lock = threading.Lock()
+
+
+def get_solver_executor():
+    global _solver_executor
+    with _solver_executor_lock:
+        if _solver_executor is None:
+            config = getattr(settings, 'FLOORPLAN_ASYNC_EXECUTOR', None) or {}
+            _solver_executor = SolverExecutor(config.get('KIND', 'process'), config.get('WORKERS'), config.get('MAX_PENDING', 32))
+        return _solver_executor
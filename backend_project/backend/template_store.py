@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+import threading
+from types import MappingProxyType
+
+from django.conf import settings
+
+TEMPLATES_PATH = os.path.join(settings.BASE_DIR, 'src', 'converted_coordinates.json')
+
+
+def freeze_template(rooms):
+    # {room: [[[x, y], [x, y]], ...]} -> read-only mapping of nested tuples
+    return MappingProxyType({
+        room: tuple(tuple(tuple(point) for point in wall) for wall in walls)
+        for room, walls in rooms.items()
+    })
+
+
+def template_hash(rooms):
+    # Content hash of one template; room order is kept because the engines depend on it
+    encoded = json.dumps(rooms, separators=(',', ':')).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def thaw_template(frozen_rooms):
+    # The engines edit coordinates in place, so every request gets its own lists
+    return {
+        room: [[list(point) for point in wall] for wall in walls]
+        for room, walls in frozen_rooms.items()
+    }
+
+
+class TemplateStore:
+    """Parsed floor plan templates, loaded once and reloaded when the file changes."""
+
+    def __init__(self, path=TEMPLATES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime = None
+        # (templates, content hashes), swapped together so readers never mix two loads
+        self._state = (MappingProxyType({}), {})
+
+    def _load(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            with open(self.path) as f:
+                coordinates_data = json.load(f)
+            templates = MappingProxyType({
+                type_key: MappingProxyType({
+                    template_number: freeze_template(rooms)
+                    for template_number, rooms in templates.items()
+                })
+                for type_key, templates in coordinates_data.items()
+            })
+            hashes = {
+                (type_key, template_number): template_hash(rooms)
+                for type_key, templates in coordinates_data.items()
+                for template_number, rooms in templates.items()
+            }
+            self._state = (templates, hashes)
+            self._mtime = mtime
+
+    def preload(self):
+        self._load()
+
+    def templates(self):
+        self._load()
+        return self._state[0]
+
+    def get(self, type_key, template_number):
+        # Raises KeyError for an unknown flat type or template number
+        return thaw_template(self.templates()[type_key][template_number])
+
+    def get_with_hash(self, type_key, template_number):
+        # Template and its content hash from the same load of the file
+        self._load()
+        templates, hashes = self._state
+        return thaw_template(templates[type_key][template_number]), hashes[(type_key, template_number)]
+
+
+template_store = TemplateStore()
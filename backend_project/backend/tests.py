@@ -1,3 +1,640 @@
-from django.test import TestCase
+import copy
+import json
+import os
+import random
+import tempfile
+import uuid
+from collections import Counter
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from backend import constraint_tables, precomputed, result_cache, solver_executor, views
+from backend.result_cache import DjangoResultCache, floorplan_cache_key
+from backend.template_store import template_store
+from backend.views import TIMINGS_HEADER
+from src import adjust_dimension, test_area
+from src.adjacency import AdjacencyGraph
+from src.adjust_dimension import adjust_dimension_main
+from src.area_solver import distribute_area
+from src.constraints import ConstraintConfigError, compile_all, compile_constraints, load_constraints_config
+from src.geometry import (
+    calculate_total_area, get_room_lines, is_overlapping_or_touching1, is_wall_free, make_floorplan_model,
+    truncate_to_two_decimals
+)
+from src.snapping import build_snap_table, cluster_near_values, merge_near_coordinates, snap_near_values
+from src.wall_index import WallIndex, find_common_walls
+
+
+# Executor that runs solves in threads of the test process
+THREAD_EXECUTOR = {'KIND': 'thread', 'WORKERS': 2, 'MAX_PENDING': 4}
+
+
+def source(response):
+    # Where the plan of a request sending "timings": true came from
+    return json.loads(response[TIMINGS_HEADER])['source']
+
+
+@override_settings(FLOORPLAN_ASYNC_EXECUTOR=THREAD_EXECUTOR)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        solver_executor._solver_executor = None
+
+    def tearDown(self):
+        executor = solver_executor._solver_executor
+        if executor is not None and executor._executor is not None:
+            executor._executor.shutdown(wait=True)
+        solver_executor._solver_executor = None
+
+    def test_add_room_dead_end_is_a_bad_request(self):
+        # Neither side of the living room is free upwards, so the engine gives up
+        # with sys.exit(); the view must answer instead of raising SystemExit
+        rooms = template_store.get('2BHK', 'template4')
+        response = self.client.post('/api/async/add_new_room/', {
+            'roomName': 'Study', 'adjacentRoom': 'Living Room', 'direction': 'Top',
+            'area': 48, 'roomWidth': 8, 'roomHeight': 6, 'coordinates': rooms,
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Neither the', response.json()['error'])
+        self.assertEqual(solver_executor.get_solver_executor().pending, 0)
+
+    def test_timings_are_sent_in_a_header(self):
+        response = self.client.post('/api/async/generate_floorplan/', {
+            'template': '1BHK_template1', 'flatArea': 450, 'type': '1BHK', 'timings': True,
+        }, content_type='application/json')
+        self.assertEqual(set(response.json()), set(template_store.get('1BHK', 'template1')))
+        self.assertIn('total_ms', json.loads(response[TIMINGS_HEADER]))
+
+
+@override_settings(FLOORPLAN_RESULT_CACHE=None)
+class PrecomputedPlanTests(TestCase):
+    def setUp(self):
+        # An artifact with one plan: 1BHK template1 at 450 sq ft
+        rooms, content_hash = template_store.get_with_hash('1BHK', 'template1')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'plans.npz')
+        precomputed.write_artifact(path, [('1BHK', 'template1', content_hash, 450.0, rooms)], {'start': 450, 'stop': 450, 'step': 25},
+                                   constraint_tables.get_constraint_table().digest, 'heuristic')
+        settings_override = override_settings(FLOORPLAN_PRECOMPUTED_PATH=path)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self._reset_artifact()
+        self.addCleanup(self._reset_artifact)
+
+    def _reset_artifact(self):
+        precomputed._precomputed = None
+        precomputed._precomputed_loaded = False
+
+    def _generate(self, **data):
+        request = {'template': '1BHK_template1', 'flatArea': 450, 'type': '1BHK', 'timings': True, **data}
+        return self.client.post('/api/generate_floorplan/', request, content_type='application/json')
+
+    def test_serves_the_precomputed_plan(self):
+        self.assertEqual(source(self._generate()), 'precomputed')
+
+    def test_timings_stay_out_of_the_plan(self):
+        rooms = template_store.get('1BHK', 'template1')
+        response = self._generate()
+        self.assertEqual(set(response.json()), set(rooms))
+        self.assertNotIn(TIMINGS_HEADER, self._generate(timings=False))
+
+    def test_other_flat_type_is_solved(self):
+        # 450 sq ft is too small for a 2BHK; the solver says so with an empty plan
+        response = self._generate(type='2BHK')
+        self.assertEqual(source(response), 'solver')
+        self.assertEqual(response.json(), {})
+
+    def test_other_area_solver_is_solved(self):
+        self.assertEqual(source(self._generate(areaSolver='exact')), 'solver')
+
+    def test_other_constraints_are_solved(self):
+        write_constraints_config(self, {'same': {'Kitchen': {'min_width': 5.91}}, 'wide': {'Kitchen': {'min_width': 9}}})
+        self.assertEqual(source(self._generate(tenant='same')), 'precomputed')
+        self.assertEqual(source(self._generate(tenant='wide')), 'solver')
+
+    def test_edited_constraints_are_solved(self):
+        # The shared table itself no longer has the values the plans were solved with
+        write_constraints_config(self, {}, rooms={'Kitchen': {'min_width': 9, 'min_height': 5.91}})
+        self.assertEqual(source(self._generate()), 'solver')
+
+
+class AdjustSessionTests(TestCase):
+    def setUp(self):
+        self.rooms = template_store.get('2BHK', 'template1')
+        self.token = uuid.uuid4().hex
+        solver_executor._solver_executor = None
+        self.addCleanup(setattr, solver_executor, '_solver_executor', None)
+
+    def _adjust(self, width, data=True, url='/api/adjust_dimension/'):
+        request = {'roomDimensions': {'Kitchen': {'width': width, 'height': 0}}, 'freeze': 'Yes',
+                   'sessionToken': self.token, 'timings': True}
+        if data:
+            request['data'] = self.rooms
+        return self.client.post(url, request, content_type='application/json')
+
+    def test_second_call_continues_the_session(self):
+        self.assertEqual(source(self._adjust(9)), 'solver')
+        self.assertEqual(source(self._adjust(10, data=False)), 'session')
+
+    def test_edited_plan_starts_over(self):
+        self._adjust(9)
+        self.assertEqual(source(self._adjust(10)), 'solver')
+
+    def test_failed_solve_keeps_the_session(self):
+        self._adjust(9)
+        self.assertEqual(self._adjust('wide', data=False).status_code, 400)
+        self.assertEqual(source(self._adjust(10, data=False)), 'session')
+
+    def test_busy_executor_keeps_the_session(self):
+        self._adjust(9)
+        with override_settings(FLOORPLAN_ASYNC_EXECUTOR={'KIND': 'thread', 'WORKERS': 1, 'MAX_PENDING': 0}):
+            response = self._adjust(10, data=False, url='/api/async/adjust_dimension/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(source(self._adjust(10, data=False)), 'session')
+
+    def test_without_session_or_data_is_a_bad_request(self):
+        self.assertEqual(self._adjust(9, data=False).json(), {'error': 'data is required.'})
+
+
+class DjangoResultCacheTests(TestCase):
+    def setUp(self):
+        self.cache = DjangoResultCache('default', ttl=60)
+        self.addCleanup(self.cache.clear)
+
+    def test_pop_hands_a_value_out_once(self):
+        self.cache.set('key', 'value')
+        self.assertEqual(self.cache.pop('key'), 'value')
+        self.assertIsNone(self.cache.pop('key'))
+
+    def test_pop_skips_a_claimed_key(self):
+        # Another caller is between its get and its delete
+        self.cache.set('key', 'value')
+        caches['default'].add('key:claim', True)
+        self.assertIsNone(self.cache.pop('key'))
+        caches['default'].delete('key:claim')
+        self.assertEqual(self.cache.pop('key'), 'value')
+
+    def test_add_keeps_a_newer_value(self):
+        self.cache.set('key', 'newer')
+        self.assertFalse(self.cache.add('key', 'older'))
+        self.assertEqual(self.cache.get('key'), 'newer')
+
+
+def pairwise_merge(rooms, threshold=0.2):
+    # adjust_coordinates before merge_near_coordinates: every pair of endpoints
+    # within `threshold` on an axis is set to the pair's rounded mean
+    points = [point for shapes in rooms.values() for shape in shapes for point in shape]
+    for i in range(len(points)):
+        for j in range(i + 1, len(points)):
+            for axis in (0, 1):
+                if abs(points[i][axis] - points[j][axis]) < threshold:
+                    points[i][axis] = points[j][axis] = round((points[i][axis] + points[j][axis]) / 2, 2)
+    return rooms
+
+
+class MergeNearCoordinatesTests(TestCase):
+    def test_isolated_pairs_match_the_pairwise_merge(self):
+        # x: 1.0/1.15 and 40.0/40.19 are near pairs; y: 200.0/200.1
+        rooms = {
+            'A': [[[1.0, 100.0], [20.0, 200.0]], [[40.0, 300.0], [60.0, 400.0]]],
+            'B': [[[1.15, 500.0], [40.19, 200.1]], [[80.0, 600.0], [90.0, 700.0]]],
+        }
+        self.assertEqual(merge_near_coordinates(copy.deepcopy(rooms)), pairwise_merge(copy.deepcopy(rooms)))
+
+    def test_chain_is_split_into_short_clusters(self):
+        # Values 0.15 apart: the pairwise merge moved 10.0 up to 10.7 and a
+        # single run would move it to the mean of the whole row
+        xs = [round(10 + 0.15 * i, 2) for i in range(12)]
+        rooms = {'Row': [[[x, 5 * i], [x, 5 * i + 3]] for i, x in enumerate(xs)]}
+        merged = [wall[0][0] for wall in merge_near_coordinates(copy.deepcopy(rooms))['Row']]
+        for before, after in zip(xs, merged):
+            self.assertLess(abs(after - before), 0.2)
+        self.assertEqual(merged, [10.07, 10.07, 10.38, 10.38, 10.68, 10.68, 10.98, 10.98, 11.28, 11.28, 11.57, 11.57])
+
+    def test_templates_move_less_than_the_threshold(self):
+        for type_key, templates in template_store.templates().items():
+            for template_number in templates:
+                rooms = template_store.get(type_key, template_number)
+                merged = merge_near_coordinates(copy.deepcopy(rooms))
+                for room, walls in rooms.items():
+                    for wall, merged_wall in zip(walls, merged[room]):
+                        for point, merged_point in zip(wall, merged_wall):
+                            self.assertLess(abs(point[0] - merged_point[0]), 0.2)
+                            self.assertLess(abs(point[1] - merged_point[1]), 0.2)
+
+
+class ExactAreaSolverTests(TestCase):
+    def test_distribute_area_reaches_the_target(self):
+        widths, heights, reached = distribute_area(
+            [10, 12], [8, 9], [5, 5], [20, 20], [5, 5], [20, 20], [True, True], [False, True], 250)
+        self.assertTrue(reached)
+        self.assertAlmostEqual(float(widths @ heights), 250, places=6)
+        self.assertEqual(heights[0], 8)
+
+    def test_distribute_area_stops_at_the_bounds(self):
+        widths, heights, reached = distribute_area(
+            [10], [10], [5], [12], [5], [11], [True], [True], 500)
+        self.assertFalse(reached)
+        self.assertEqual((widths[0], heights[0]), (12, 11))
+
+    def test_generated_plans_reach_the_target_area(self):
+        areas = {'1BHK': (300, 450, 600, 900), '2BHK': (525, 700, 900, 1200)}
+        for type_key, templates in template_store.templates().items():
+            for template_number in templates:
+                for area in areas[type_key]:
+                    rooms = template_store.get(type_key, template_number)
+                    ctx = test_area.make_context(rooms, area_solver='exact')
+                    _, metadata = test_area.dynamic_area_calculater(ctx.rooms, area, ctx)
+                    # Room areas are kept in hundredths of a square foot
+                    self.assertAlmostEqual(calculate_total_area(metadata), area, delta=0.0100001, msg=f'{type_key} {template_number} at {area}')
+
+    def test_adjusted_plans_keep_their_area(self):
+        for type_key, templates in template_store.templates().items():
+            for template_number in templates:
+                rooms = template_store.get(type_key, template_number)
+                area = calculate_total_area(adjust_dimension.make_floorplan_model(copy.deepcopy(rooms)).metadata)
+                room = next(iter(rooms))
+                width, _ = adjust_dimension.calculate_dimensions_from_metadata(adjust_dimension.make_floorplan_model(copy.deepcopy(rooms)).metadata[room])
+                dimensions = {room: {'width': round(width * 1.1, 2), 'height': 0}}
+                result = adjust_dimension_main(copy.deepcopy(rooms), dimensions, 'Yes', None, 'exact')
+                final_area = calculate_total_area(adjust_dimension.make_floorplan_model(result).metadata)
+                # The adjust engine truncates each room's area to the hundredth
+                self.assertAlmostEqual(final_area, area, delta=0.05, msg=f'{type_key} {template_number}')
+
+
+def template_plans():
+    # Every shipped template, as drawn and scaled to a larger flat
+    areas = {'1BHK': 600, '2BHK': 900}
+    for type_key, templates in template_store.templates().items():
+        for template_number in templates:
+            rooms = template_store.get(type_key, template_number)
+            yield f'{type_key} {template_number}', rooms
+            generated, _ = test_area.dynamic_area_calculater(copy.deepcopy(rooms), areas[type_key])
+            yield f'{type_key} {template_number} at {areas[type_key]}', generated
+
+
+def pairwise_common_walls(room_data):
+    # find_and_display_common_walls before the wall index: every line of every
+    # pair of rooms compared with is_overlapping_or_touching1
+    common_walls_info = {}
+    room_names = list(room_data)
+    for i in range(len(room_names)):
+        for j in range(i + 1, len(room_names)):
+            room1, room2 = room_names[i], room_names[j]
+            common_walls = [(line1, line2) for line1 in get_room_lines(room1, room_data) for line2 in get_room_lines(room2, room_data) if is_overlapping_or_touching1(line1, line2)]
+            if common_walls:
+                common_walls_info[(room1, room2)] = common_walls
+    return common_walls_info
+
+
+class WallIndexTests(TestCase):
+    def test_is_free_matches_the_wall_scan(self):
+        for name, rooms in template_plans():
+            index = WallIndex(rooms)
+            for room, walls in rooms.items():
+                for wall in walls:
+                    self.assertEqual(index.is_free(wall, room), is_wall_free(wall, room, rooms), msg=f'{name}: {room} {wall}')
+
+    def test_common_walls_match_the_pairwise_scan(self):
+        for name, rooms in template_plans():
+            self.assertEqual(find_common_walls(rooms), pairwise_common_walls(rooms), msg=name)
+
+    def test_removed_walls_no_longer_block(self):
+        rooms = template_store.get('2BHK', 'template1')
+        index = WallIndex(rooms)
+        moved_room = next(iter(rooms))
+        for key, wall in enumerate(rooms[moved_room]):
+            index.remove(wall, moved_room, key)
+        others = {room: walls for room, walls in rooms.items() if room != moved_room}
+        for room, walls in others.items():
+            for wall in walls:
+                self.assertEqual(index.is_free(wall, room), is_wall_free(wall, room, others))
+        for key, wall in enumerate(rooms[moved_room]):
+            index.add(wall, moved_room, key)
+        for room, walls in rooms.items():
+            for wall in walls:
+                self.assertEqual(index.is_free(wall, room), is_wall_free(wall, room, rooms))
+
+    def test_zero_length_wall_is_checked_on_both_axes(self):
+        rooms = {'A': [[[0, 0], [10, 0]]], 'B': [[[5, 0], [5, 0]]], 'C': [[[0, 3], [0, 8]]]}
+        index = WallIndex(rooms)
+        for room, walls in rooms.items():
+            for wall in walls:
+                self.assertEqual(index.is_free(wall, room), is_wall_free(wall, room, rooms), msg=room)
+
+
+def translate_room(room, dx, dy, metadata):
+    # Move every wall of `room` in place, as the stitching and shift steps do
+    for data in metadata[room].values():
+        for point in data['coordinates']:
+            point[0] = round(point[0] + dx, 2)
+            point[1] = round(point[1] + dy, 2)
+
+
+class FloorPlanModelSyncTests(TestCase):
+    def assertMatchesRebuild(self, plan, msg=None):
+        self.assertEqual(plan.metadata, make_floorplan_model(plan.rooms()).metadata, msg=msg)
+
+    def test_moved_rooms_match_a_rebuild(self):
+        for name, rooms in template_plans():
+            plan = make_floorplan_model(copy.deepcopy(rooms))
+            for room, (dx, dy) in zip(rooms, [(1.5, 0), (0, 1.5), (-1.5, 0), (0, -1.5)]):
+                translate_room(room, dx, dy, plan.metadata)
+                plan.sync()
+                self.assertEqual(plan.moved_walls, [(room, wall_id) for wall_id in plan.metadata[room]])
+                self.assertMatchesRebuild(plan, msg=f'{name}: {room} by {dx}, {dy}')
+            self.assertEqual(plan.rebuild_count, 1)
+
+    def test_resized_rooms_match_a_rebuild(self):
+        for name, rooms in template_plans():
+            plan = make_floorplan_model(copy.deepcopy(rooms))
+            for room in rooms:
+                width, height = test_area.calculate_dimensions_from_metadata(plan.metadata[room])
+                test_area.update_wall_length_by_dimension(room, 'width', width + 2, plan.metadata, plan.rooms())
+                edited = plan.rooms()
+                plan.sync(test_area.replace_near_values(copy.deepcopy(edited), threshold=0.3))
+                self.assertMatchesRebuild(plan, msg=f'{name}: {room}')
+            self.assertEqual(plan.rebuild_count, 1)
+
+    def test_unmoved_plan_changes_nothing(self):
+        plan = make_floorplan_model(template_store.get('1BHK', 'template1'))
+        plan.sync(copy.deepcopy(plan.rooms()))
+        self.assertEqual(plan.moved_walls, [])
+        self.assertMatchesRebuild(plan)
+
+    def test_new_room_rebuilds_the_plan(self):
+        rooms = template_store.get('1BHK', 'template1')
+        plan = make_floorplan_model(copy.deepcopy(rooms))
+        grown = copy.deepcopy(rooms)
+        grown['Study'] = [[[100, 100], [108, 100]], [[108, 100], [108, 106]], [[108, 106], [100, 106]], [[100, 106], [100, 100]]]
+        plan.sync(grown)
+        self.assertEqual(plan.rebuild_count, 2)
+        self.assertEqual(plan.metadata, make_floorplan_model(grown).metadata)
+
+    def test_reshaped_room_rebuilds_the_plan(self):
+        rooms = template_store.get('1BHK', 'template1')
+        plan = make_floorplan_model(copy.deepcopy(rooms))
+        reshaped = copy.deepcopy(rooms)
+        room = next(iter(reshaped))
+        start, end = reshaped[room][0]
+        middle = [(start[0] + end[0]) / 2, (start[1] + end[1]) / 2]
+        reshaped[room][0:1] = [[start, middle], [middle, end]]
+        plan.sync(reshaped)
+        self.assertEqual(plan.rebuild_count, 2)
+        self.assertEqual(plan.metadata, make_floorplan_model(reshaped).metadata)
+
+
+class AdjacencyGraphTests(TestCase):
+    def test_sync_matches_a_new_graph(self):
+        # template_plans gives each template as drawn, then as generated
+        plans = list(template_plans())
+        for (name, drawn), (_, generated) in zip(plans[::2], plans[1::2]):
+            adjacency = AdjacencyGraph(drawn)
+            adjacency.sync(generated)
+            expected = AdjacencyGraph(generated)
+            for room in generated:
+                self.assertEqual(adjacency.adjacent_rooms(room), expected.adjacent_rooms(room), msg=f'{name}: {room}')
+
+    def test_sync_only_reindexes_moved_rooms(self):
+        rooms = template_store.get('2BHK', 'template1')
+        adjacency = AdjacencyGraph(rooms)
+        moved = copy.deepcopy(rooms)
+        room = next(iter(moved))
+        moved[room] = [[[x + 0.5, y] for x, y in wall] for wall in moved[room]]
+        with mock.patch.object(adjacency, 'move_room', wraps=adjacency.move_room) as move_room:
+            adjacency.sync(moved)
+        self.assertEqual([call.args[0] for call in move_room.call_args_list], [room])
+
+
+def group_near_values(values, threshold=0.9):
+    # Grouping of replace_near_values before the snap table
+    groups = []
+    while values:
+        base = values.pop(0)
+        group = [base]
+        for v in values[:]:
+            if abs(base - v) < threshold:
+                group.append(v)
+                values.remove(v)
+        groups.append(group)
+    return groups
+
+
+def looped_replace_near_values(rooms, threshold=0.9, transform=None):
+    # replace_near_values before the snap table: each point is checked against
+    # every group in turn and takes the group's most frequent value
+    unique_values = list(set(value for coordinates in rooms.values() for line in coordinates for point in line for value in point))
+    groups = group_near_values(unique_values, threshold)
+    most_frequent_values = {tuple(group): Counter(group).most_common(1)[0][0] for group in groups}
+    for coordinates in rooms.values():
+        for line in coordinates:
+            for point in line:
+                for group, value in most_frequent_values.items():
+                    if point[0] in group:
+                        point[0] = transform(value) if transform else value
+                    if point[1] in group:
+                        point[1] = transform(value) if transform else value
+    return rooms
+
+
+class SnapTableTests(TestCase):
+    def test_clusters_match_the_group_loop(self):
+        generator = random.Random(5)
+        for threshold in (0.09, 0.3, 0.9):
+            values = list({round(generator.uniform(0, 60), 2) for _ in range(300)})
+            generator.shuffle(values)
+            groups = [[base] + sorted(set(members) - {base}) for base, members in cluster_near_values(values, threshold)]
+            expected = [[group[0]] + sorted(group[1:]) for group in group_near_values(list(values), threshold)]
+            self.assertEqual(groups, expected, msg=threshold)
+
+    def test_templates_snap_like_the_loop(self):
+        for name, rooms in template_plans():
+            for threshold in (0.09, 0.3, 0.9):
+                for transform in (None, truncate_to_two_decimals):
+                    self.assertEqual(
+                        snap_near_values(copy.deepcopy(rooms), threshold, transform),
+                        looped_replace_near_values(copy.deepcopy(rooms), threshold, transform),
+                        msg=f'{name} at {threshold} with {transform}')
+
+    def test_transformed_base_follows_later_groups(self):
+        # Each base moved into the next group down: the loop rewrote 3 to 2, then 1, then 0
+        table = build_snap_table([3.0, 2.0, 1.0], 0.5, lambda value: value - 1)
+        self.assertEqual(table, {3.0: 0.0, 2.0: 0.0, 1.0: 0.0})
+        rooms = {'A': [[[3.0, 2.0], [1.0, 3.0]]]}
+        self.assertEqual(snap_near_values(copy.deepcopy(rooms), 0.5, lambda value: value - 1),
+                         looped_replace_near_values(copy.deepcopy(rooms), 0.5, lambda value: value - 1))
+
+
+def write_constraints_config(test, tenants, rooms=None):
+    # The shipped constraints, with `rooms` entries replaced, plus `tenants`, as
+    # FLOORPLAN_CONSTRAINTS_PATH for the test
+    with open(os.path.join(os.path.dirname(test_area.__file__), 'room_constraints.json')) as f:
+        config = json.load(f)
+    config['rooms'].update(rooms or {})
+    config['tenants'] = tenants
+    directory = tempfile.TemporaryDirectory()
+    test.addCleanup(directory.cleanup)
+    path = os.path.join(directory.name, 'constraints.json')
+    with open(path, 'w') as f:
+        json.dump(config, f)
+    settings_override = override_settings(FLOORPLAN_CONSTRAINTS_PATH=path)
+    settings_override.enable()
+    test.addCleanup(settings_override.disable)
+    constraint_tables._tables = None
+    test.addCleanup(setattr, constraint_tables, '_tables', None)
+
+
+class FloorplanCacheKeyTests(TestCase):
+    def test_integer_and_float_areas_share_a_key(self):
+        self.assertEqual(floorplan_cache_key('1BHK_template1', '1BHK', 450, 'hash'),
+                         floorplan_cache_key('1BHK_template1', '1BHK', 450.0, 'hash'))
+
+    def test_every_part_of_the_request_is_in_the_key(self):
+        key = floorplan_cache_key('1BHK_template1', '1BHK', 450, 'hash')
+        self.assertNotEqual(key, floorplan_cache_key('1BHK_template2', '1BHK', 450, 'hash'))
+        self.assertNotEqual(key, floorplan_cache_key('1BHK_template1', '2BHK', 450, 'hash'))
+        self.assertNotEqual(key, floorplan_cache_key('1BHK_template1', '1BHK', 450.5, 'hash'))
+        self.assertNotEqual(key, floorplan_cache_key('1BHK_template1', '1BHK', 450, 'other hash'))
+        # Only numbers are normalised; the solver rejects these differently
+        self.assertNotEqual(key, floorplan_cache_key('1BHK_template1', '1BHK', '450', 'hash'))
+        self.assertNotEqual(floorplan_cache_key('1BHK_template1', '1BHK', True, 'hash'),
+                            floorplan_cache_key('1BHK_template1', '1BHK', 1.0, 'hash'))
+
+
+@override_settings(FLOORPLAN_RESULT_CACHE={'BACKEND': 'local', 'MAX_ENTRIES': 16, 'TTL': 60}, FLOORPLAN_PRECOMPUTED_PATH=None)
+class FloorplanResultCacheTests(TestCase):
+    def setUp(self):
+        self._reset_caches()
+        self.addCleanup(self._reset_caches)
+        write_constraints_config(self, {
+            'same': {'Kitchen': {'min_width': 5.91}},
+            'wide': {'Kitchen': {'min_width': 9}},
+        })
+        solver = mock.patch.object(views, 'generate_floorplan_main', wraps=views.generate_floorplan_main)
+        self.solver = solver.start()
+        self.addCleanup(solver.stop)
+
+    @staticmethod
+    def _reset_caches():
+        result_cache._result_cache = None
+        result_cache._result_cache_loaded = False
+        precomputed._precomputed = None
+        precomputed._precomputed_loaded = False
+
+    def _generate(self, **data):
+        request = {'template': '1BHK_template1', 'flatArea': 450, 'type': '1BHK', **data}
+        response = self.client.post('/api/generate_floorplan/', request, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_repeated_request_is_served_from_the_cache(self):
+        plan = self._generate()
+        self.assertEqual(self._generate(), plan)
+        self.assertEqual(self._generate(flatArea=450.0), plan)
+        self.assertEqual(self.solver.call_count, 1)
+
+    def test_other_area_is_solved(self):
+        self._generate()
+        self._generate(flatArea=475)
+        self.assertEqual(self.solver.call_count, 2)
+
+    def test_other_area_solver_is_solved(self):
+        self._generate()
+        self._generate(areaSolver='exact')
+        self._generate(areaSolver='exact')
+        self.assertEqual(self.solver.call_count, 2)
+
+    def test_tenant_constraints_are_in_the_key(self):
+        self._generate()
+        # Same values as the shared table: same digest, same plan
+        self._generate(tenant='same')
+        self.assertEqual(self.solver.call_count, 1)
+        self._generate(tenant='wide')
+        self._generate(tenant='wide')
+        self.assertEqual(self.solver.call_count, 2)
+
+
+class ConstraintConfigTests(TestCase):
+    config = {
+        'rooms': {
+            'Kitchen': {'min_width': 5.91, 'min_height': 5.91},
+            'Common Washroom': {'min_width': 3.3, 'min_height': 3.3, 'cap_width': 8, 'cap_height': 8},
+        },
+        'tenants': {'acme': {'Kitchen': {'min_width': 7}, 'Study': {'min_width': 6, 'min_height': 6, 'max_width': 10}}},
+    }
+
+    def assertConfigError(self, config, message, tenant=None):
+        with self.assertRaisesMessage(ConstraintConfigError, message):
+            compile_constraints(config, tenant)
+
+    def test_shipped_config_compiles(self):
+        tables = compile_all(load_constraints_config())
+        self.assertEqual(list(tables), [None])
+        self.assertEqual(tables[None].get('Kitchen').min_width, 5.91)
+
+    def test_tenant_overrides_single_fields(self):
+        shared, acme = compile_constraints(self.config), compile_constraints(self.config, 'acme')
+        self.assertEqual((acme.get('Kitchen').min_width, acme.get('Kitchen').min_height), (7, 5.91))
+        self.assertEqual(acme.get('Study').max_width, 10)
+        self.assertNotIn('Study', shared)
+        self.assertEqual(shared.get('Kitchen').max_width, float('inf'))
+        self.assertIsNone(shared.get('Kitchen').cap_width)
+        self.assertNotEqual(shared.digest, acme.digest)
+        self.assertEqual(shared.digest, compile_constraints(copy.deepcopy(self.config)).digest)
+
+    def test_resolve_maps_room_ids_to_their_type(self):
+        table = compile_constraints(self.config)
+        resolved = table.resolve(['Kitchen', 'Kitchen#2', 'Common Washroom#2', 'Balcony'])
+        self.assertEqual(set(resolved), {'Kitchen', 'Kitchen#2', 'Common Washroom#2'})
+        self.assertIs(resolved['Kitchen#2'], table.get('Kitchen'))
+        self.assertEqual(resolved['Common Washroom#2'].cap_height, 8)
+
+    def test_missing_field_is_rejected(self):
+        self.assertConfigError({'rooms': {'Kitchen': {'min_width': 5}}}, 'rooms.Kitchen is missing min_height.')
+
+    def test_unknown_field_is_rejected(self):
+        self.assertConfigError({'rooms': {'Kitchen': {'min_width': 5, 'min_height': 5, 'min_depth': 1}}}, 'rooms.Kitchen has unknown fields: min_depth.')
+
+    def test_bound_below_minimum_is_rejected(self):
+        self.assertConfigError({'rooms': {'Kitchen': {'min_width': 5, 'min_height': 5, 'max_width': 4}}}, 'rooms.Kitchen.max_width (4) is below min_width (5).')
+        self.assertConfigError({'rooms': {'Kitchen': {'min_width': 5, 'min_height': 5, 'cap_height': 4}}}, 'rooms.Kitchen.cap_height (4) is below min_height (5).')
+        self.assertConfigError(self.config | {'tenants': {'acme': {'Kitchen': {'min_width': 9}, 'Common Washroom': {'min_width': 9}}}},
+                               'tenants.acme.Common Washroom.cap_width (8) is below min_width (9).', 'acme')
+
+    def test_bad_values_are_rejected(self):
+        for value in (-1, '5', True, float('nan'), None):
+            self.assertConfigError({'rooms': {'Kitchen': {'min_width': value, 'min_height': 5}}}, 'rooms.Kitchen.min_width must be a non-negative number')
+
+    def test_bad_layout_is_rejected(self):
+        self.assertConfigError([], "needs a 'rooms' object")
+        self.assertConfigError({'tenants': {}}, "needs a 'rooms' object")
+        self.assertConfigError({'rooms': {'Kitchen': [5, 5]}}, 'rooms.Kitchen must be an object.')
+        self.assertConfigError({'rooms': {}, 'tenants': ['acme']}, "'tenants' must be an object.")
+        self.assertConfigError({'rooms': {}, 'tenants': {'acme': []}}, 'tenants.acme must be an object.', 'acme')
+        self.assertConfigError({'rooms': {}, 'tenants': {'acme': {'Kitchen': 5}}}, 'tenants.acme.Kitchen must be an object.', 'acme')
+
+    def test_unknown_tenant_is_rejected(self):
+        self.assertConfigError(self.config, "Unknown tenant 'globex'.", 'globex')
+
+    def test_bad_json_is_rejected(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            f.write('{"rooms": {')
+        self.addCleanup(os.remove, f.name)
+        with self.assertRaisesMessage(ConstraintConfigError, 'is not valid JSON'):
+            load_constraints_config(f.name)
+        with override_settings(FLOORPLAN_CONSTRAINTS_PATH=f.name):
+            constraint_tables._tables = None
+            self.addCleanup(setattr, constraint_tables, '_tables', None)
+            with self.assertRaises(ImproperlyConfigured):
+                constraint_tables.constraint_tables()
+
+    def test_unknown_tenant_request_is_a_bad_request(self):
+        write_constraints_config(self, {'acme': {'Kitchen': {'min_width': 7}}})
+        request = {'template': '1BHK_template1', 'flatArea': 450, 'type': '1BHK'}
+        response = self.client.post('/api/generate_floorplan/', {**request, 'tenant': 'globex'}, content_type='application/json')
+        self.assertEqual((response.status_code, response.json()), (400, {'error': 'Unknown tenant.'}))
+        response = self.client.post('/api/generate_floorplan/', {**request, 'tenant': 'acme'}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
@@ -1,8 +1,16 @@
 from django.urls import path
-from .views import generate_floorplan_func,adjust_dimension_func,add_new_room_func
+from .views import generate_floorplan_func,generate_floorplan_batch_func,adjust_dimension_func,add_new_room_func,metrics_func
+from .async_views import generate_floorplan_async,adjust_dimension_async,add_new_room_async,health_async
  
 urlpatterns = [
     path('generate_floorplan/', generate_floorplan_func, name='generate_floorplan'),
+    path('generate_floorplan_batch/', generate_floorplan_batch_func, name='generate_floorplan_batch'),
     path('adjust_dimension/', adjust_dimension_func, name='adjust_dimension'),
-    path('add_new_room/', add_new_room_func, name='add_new_room')
+    path('add_new_room/', add_new_room_func, name='add_new_room'),
+    # Same endpoints for ASGI deployments, with the solver off the event loop
+    path('async/generate_floorplan/', generate_floorplan_async, name='generate_floorplan_async'),
+    path('async/adjust_dimension/', adjust_dimension_async, name='adjust_dimension_async'),
+    path('async/add_new_room/', add_new_room_async, name='add_new_room_async'),
+    path('health/', health_async, name='health'),
+    path('metrics/', metrics_func, name='metrics')
 ]
\ No newline at end of file
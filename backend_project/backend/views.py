@@ -1,122 +1,314 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from src.test_area import generate_floorplan_main
+from rest_framework.utils.encoders import JSONEncoder
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from src.test_area import convert_all_rooms_to_walls, generate_floorplan_main
 from src.adjust_dimension import adjust_dimension_main
+from src.area_solver import AREA_SOLVERS
+from src.metrics import StageMetrics, collect_metrics, registry
 from src.new_room_placement import add_new_room_main
+from .adjust_sessions import get_adjust_sessions
+from .batch import run_batch
+from .constraint_tables import get_constraint_table
+from .precomputed import get_precomputed_plans
+from .result_cache import floorplan_cache_key, get_result_cache
+from .template_store import template_store
 import json
  
+def _constraints_for(data):
+    # The constraint table of the request's tenant: (table, None) or (None, (error, status))
+    tenant = data.get('tenant')
+    try:
+        return get_constraint_table(tenant), None
+    except (KeyError, TypeError):
+        return None, ('Unknown tenant.', status.HTTP_400_BAD_REQUEST)
+
+def _area_solver_for(data):
+    # The area distribution mode of the request: (mode, None) or (None, (error, status))
+    area_solver = data.get('areaSolver') or getattr(settings, 'FLOORPLAN_AREA_SOLVER', 'heuristic')
+    if area_solver not in AREA_SOLVERS:
+        return None, (f"areaSolver must be one of {', '.join(AREA_SOLVERS)}.", status.HTTP_400_BAD_REQUEST)
+    return area_solver, None
+
+def _floorplan_job(data):
+    # Validate one generate request. Returns (job, cache_key, precomputed, None), where
+    # `precomputed` is the response when the plan was solved ahead of time, or
+    # (None, None, None, (error, status)).
+    # Extract required fields
+    template = data.get('template')  # For example: "1BHK_template5"
+    flat_area = data.get('flatArea')
+    flat_type = data.get('type')
+
+    # Ensure required fields are provided
+    if not template:
+        return None, None, None, ('Template is required.', status.HTTP_400_BAD_REQUEST)
+    if not flat_area:
+        return None, None, None, ('Flat area is required.', status.HTTP_400_BAD_REQUEST)
+    if not flat_type:
+        return None, None, None, ('Flat type is required.', status.HTTP_400_BAD_REQUEST)
+    constraints, error = _constraints_for(data)
+    if error:
+        return None, None, None, error
+    area_solver, error = _area_solver_for(data)
+    if error:
+        return None, None, None, error
+
+    # Extract the flat type (e.g., "1BHK") and template number (e.g., "template5") from template
+    try:
+        type_key, template_number = template.split('_')
+    except ValueError:
+        return None, None, None, ('Invalid template format.', status.HTTP_400_BAD_REQUEST)
+
+    # Fetch the coordinates for the given flat type and template from the preloaded store
+    try:
+        template_coords, content_hash = template_store.get_with_hash(type_key, template_number)
+    except FileNotFoundError:
+        return None, None, None, ('Coordinates file not found.', status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except json.JSONDecodeError:
+        return None, None, None, ('Error decoding JSON file.', status.HTTP_500_INTERNAL_SERVER_ERROR)
+    except KeyError:
+        return None, None, None, ('Template not found.', status.HTTP_400_BAD_REQUEST)
+
+    # Serve grid areas from the precomputed plans and start other areas from the
+    # nearest one. The plans were solved with the template's own flat type, which
+    # sets the smallest area, and only serve requests with the same constraints and
+    # area solver
+    precomputed = None
+    if flat_type == type_key:
+        precomputed = get_precomputed_plans()
+        if precomputed is not None and not precomputed.matches(constraints, area_solver):
+            precomputed = None
+    if precomputed is not None and isinstance(flat_area, (int, float)) and not isinstance(flat_area, bool):
+        rooms = precomputed.exact(type_key, template_number, content_hash, flat_area)
+        if rooms is not None:
+            return (template_coords, flat_type, flat_area, constraints, area_solver), None, convert_all_rooms_to_walls(rooms), None
+        if getattr(settings, 'FLOORPLAN_PRECOMPUTED_WARM_START', True):
+            rooms = precomputed.nearest(type_key, template_number, content_hash, flat_area, precomputed.grid['step'])
+            if rooms is not None:
+                template_coords = rooms
+                # The result now also depends on the artifact
+                content_hash = f'{content_hash}:{precomputed.digest}'
+
+    # Plans depend on the constraints and the area solver as much as on the template
+    cache_key = floorplan_cache_key(template, flat_type, flat_area, f'{content_hash}:{constraints.digest}:{area_solver}')
+    return (template_coords, flat_type, flat_area, constraints, area_solver), cache_key, None, None
+
+def _generate_floorplan(job, cache_key, precomputed):
+    # The plan for a validated request and where it came from
+    if precomputed is not None:
+        return precomputed, 'precomputed'
+    template_coords, flat_type, flat_area, constraints, area_solver = job
+
+    # The pipeline is deterministic, so a repeated request is served from the cache
+    result_cache = get_result_cache()
+    if result_cache is not None:
+        response_data = result_cache.get(cache_key)
+        if response_data is not None:
+            return response_data, 'cache'
+ 
+    # Include the coordinates in the response data
+    response_data = generate_floorplan_main(template_coords,flat_type,flat_area,constraints,area_solver)
+    if result_cache is not None:
+        result_cache.set(cache_key, response_data)
+    return response_data, 'solver'
+
+TIMINGS_HEADER = 'X-Floorplan-Timings'
+
+def _timings_headers(data, source, metrics):
+    # Requests sending "timings": true get their stage timers and counters back as
+    # JSON in the X-Floorplan-Timings header, so the body stays a map of room ids
+    if not data.get('timings'):
+        return None
+    return {TIMINGS_HEADER: json.dumps({'source': source, **metrics.as_dict()}, cls=JSONEncoder, separators=(',', ':'))}
+
 @api_view(['POST'])
 def generate_floorplan_func(request):
     try:
         # Access the entire JSON data
         data = request.data
        
-        # Extract required fields
-        template = data.get('template')  # For example: "1BHK_template5"
-        flat_area = data.get('flatArea')
-        flat_type = data.get('type')
- 
-        # Ensure required fields are provided
-        if not template:
-            return Response({'error': 'Template is required.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not flat_area:
-            return Response({'error': 'Flat area is required.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not flat_type:
-            return Response({'error': 'Flat type is required.'}, status=status.HTTP_400_BAD_REQUEST)
- 
-        # Extract the flat type (e.g., "1BHK") and template number (e.g., "template5") from template
-        try:
-            type_key, template_number = template.split('_')
-        except ValueError:
-            return Response({'error': 'Invalid template format.'}, status=status.HTTP_400_BAD_REQUEST)
- 
-        # Load the coordinates from the JSON file
-        try:
-            with open('src/converted_coordinates.json') as f:
-                coordinates_data = json.load(f)
-        except FileNotFoundError:
-            return Response({'error': 'Coordinates file not found.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        except json.JSONDecodeError:
-            return Response({'error': 'Error decoding JSON file.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
- 
-        # Extract the coordinates for the given flat type and template
-        try:
-            template_coords = coordinates_data[type_key][template_number]
-        except KeyError:
-            return Response({'error': 'Template not found.'}, status=status.HTTP_400_BAD_REQUEST)
- 
-        # Include the coordinates in the response data
-        response_data = generate_floorplan_main(template_coords,flat_type,flat_area)
- 
-        return Response(response_data, status=status.HTTP_200_OK)
+        with collect_metrics() as metrics:
+            job, cache_key, precomputed, error = _floorplan_job(data)
+            if error:
+                return Response({'error': error[0]}, status=error[1])
+            response_data, source = _generate_floorplan(job, cache_key, precomputed)
+        registry.record('generate', source, metrics)
+ 
+        return Response(response_data, status=status.HTTP_200_OK, headers=_timings_headers(data, source, metrics))
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+ 
+@api_view(['POST'])
+def generate_floorplan_batch_func(request):
+    try:
+        jobs_data = request.data.get('jobs')
+
+        if not jobs_data or not isinstance(jobs_data, list):
+            return Response({'error': 'jobs must be a non-empty list.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Invalid jobs get their error in place, cached ones their cached plan;
+        # the rest run on the worker pool
+        result_cache = get_result_cache()
+        results = [None] * len(jobs_data)
+        jobs = []
+        positions = []
+        cache_keys = []
+        for i, data in enumerate(jobs_data):
+            if not isinstance(data, dict):
+                results[i] = {'error': 'Each job must be an object.'}
+                continue
+            job, cache_key, precomputed, error = _floorplan_job(data)
+            if error:
+                results[i] = {'error': error[0]}
+                continue
+            if precomputed is not None:
+                results[i] = precomputed
+                registry.record('generate', 'precomputed', StageMetrics())
+                continue
+            if result_cache is not None:
+                results[i] = result_cache.get(cache_key)
+                if results[i] is not None:
+                    registry.record('generate', 'cache', StageMetrics())
+                    continue
+            jobs.append(job)
+            positions.append(i)
+            cache_keys.append(cache_key)
+
+        for i, cache_key, response_data in zip(positions, cache_keys, run_batch(jobs)):
+            results[i] = response_data
+            if result_cache is not None and 'error' not in response_data:
+                result_cache.set(cache_key, response_data)
+
+        return Response({'results': results}, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
  
+def _adjust_job(data):
+    # Validate one adjust request. Returns (args, lease, None) with the
+    # adjust_dimension_main arguments and the SessionLease of a sessionToken
+    # (None without one), or (None, None, (error, status)). The lease must be
+    # finished with _finish_adjust whatever happens to the solve.
+    fixed_dimension = data.get('roomDimensions')  # For example: "1BHK_template5"
+    canvas_coords = data.get('data')
+    freeze = data.get('freeze')
+    session_token = data.get('sessionToken')
+ 
+    # Ensure required fields are provided
+    if not fixed_dimension:
+        return None, None, ('roomDimensions is required.', status.HTTP_400_BAD_REQUEST)
+    if not canvas_coords and not session_token:
+        return None, None, ('data is required.', status.HTTP_400_BAD_REQUEST)
+    if not freeze:
+        return None, None, ('freeze is required.', status.HTTP_400_BAD_REQUEST)
+    constraints, error = _constraints_for(data)
+    if error:
+        return None, None, error
+    area_solver, error = _area_solver_for(data)
+    if error:
+        return None, None, error
+ 
+    # With a session the plan of the last call is reused and only changed
+    # dimensions are applied; `data` may then be left out
+    adjust_sessions = get_adjust_sessions() if session_token else None
+    lease = adjust_sessions.take(session_token, canvas_coords) if adjust_sessions is not None else None
+    if not canvas_coords and (lease is None or not lease.session.is_warm(constraints)):
+        _finish_adjust(lease, None)
+        return None, None, ('data is required.', status.HTTP_400_BAD_REQUEST)
+    return (canvas_coords, fixed_dimension, freeze, constraints, area_solver), lease, None
+
+def _finish_adjust(lease, session):
+    # Store the session a solve left behind, or put the old one back when
+    # `session` is None because the request failed
+    if lease is not None:
+        lease.finish(session)
+ 
 @api_view(['POST'])
 def adjust_dimension_func(request):
     try:
         # Access the entire JSON data
         data = request.data
  
-        # Extract required fields
-        fixed_dimension = data.get('roomDimensions')  # For example: "1BHK_template5"
-        canvas_coords = data.get('data')
-        freeze = data.get('freeze')
- 
-        # Ensure required fields are provided
-        if not fixed_dimension:
-            return Response({'error': 'roomDimensions is required.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not canvas_coords:
-            return Response({'error': 'data is required.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not freeze:
-            return Response({'error': 'freeze is required.'}, status=status.HTTP_400_BAD_REQUEST)
-       
+        with collect_metrics() as metrics:
+            args, lease, error = _adjust_job(data)
+            if error:
+                return Response({'error': error[0]}, status=error[1])
+            session = lease.session if lease is not None else None
+            source = 'session' if session is not None and session.is_warm(args[3]) else 'solver'
        
-        # Include the coordinates in the response data
-        response_data = adjust_dimension_main(canvas_coords,fixed_dimension,freeze)
+            # Include the coordinates in the response data
+            solved = None
+            try:
+                response_data = adjust_dimension_main(*args, session=session)
+                solved = session
+            finally:
+                _finish_adjust(lease, solved)
+        registry.record('adjust', source, metrics)
  
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(response_data, status=status.HTTP_200_OK, headers=_timings_headers(data, source, metrics))
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
  
  
+def _add_room_job(data):
+    # Validate one add-room request; returns (args, None) with the add_new_room_main
+    # arguments, or (None, (error, status))
+    roomName = data.get('roomName')  # For example: "1BHK_template5"
+    adjacentRoom = data.get('adjacentRoom')
+    direction = data.get('direction')
+    area = data.get('area')
+    roomWidth = data.get('roomWidth')
+    roomHeight = data.get('roomHeight')
+    coordinates = data.get('coordinates')
+    # freeze = data.get('coordinates')
+    # Ensure required fields are provided
+    if not roomName:
+        return None, ('roomName is required.', status.HTTP_400_BAD_REQUEST)
+    if not adjacentRoom:
+        return None, ('adjacentRoom is required.', status.HTTP_400_BAD_REQUEST)
+    if not direction:
+        return None, ('direction is required.', status.HTTP_400_BAD_REQUEST)
+    if not area:
+        return None, ('area is required.', status.HTTP_400_BAD_REQUEST)
+    if not roomWidth:
+        return None, ('roomWidth is required.', status.HTTP_400_BAD_REQUEST)
+    if not roomHeight:
+        return None, ('roomHeight is required.', status.HTTP_400_BAD_REQUEST)
+    if not coordinates:
+        return None, ('coordinates is required.', status.HTTP_400_BAD_REQUEST)
+    # Room ids are unique within a plan; a second bedroom is e.g. "Bedroom#2"
+    if roomName in coordinates:
+        return None, (f'A room with id {roomName!r} is already in the plan.', status.HTTP_400_BAD_REQUEST)
+    # if not freeze:
+    #     return None, ('freeze is required.', status.HTTP_400_BAD_REQUEST)
+    return (coordinates, roomName, roomWidth, roomHeight, adjacentRoom, direction), None
+ 
 @api_view(['POST'])
 def add_new_room_func(request):
     try:
         # Access the entire JSON data
         data = request.data
  
-        # Extract required fields
-        roomName = data.get('roomName')  # For example: "1BHK_template5"
-        adjacentRoom = data.get('adjacentRoom')
-        direction = data.get('direction')
-        area = data.get('area')
-        roomWidth = data.get('roomWidth')
-        roomHeight = data.get('roomHeight')
-        coordinates = data.get('coordinates')
-        # freeze = data.get('coordinates')
-        # Ensure required fields are provided
-        if not roomName:
-            return Response({'error': 'roomName is required.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not adjacentRoom:
-            return Response({'error': 'adjacentRoom is required.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not direction:
-            return Response({'error': 'direction is required.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not area:
-            return Response({'error': 'area is required.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not roomWidth:
-            return Response({'error': 'roomWidth is required.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not roomHeight:
-            return Response({'error': 'roomHeight is required.'}, status=status.HTTP_400_BAD_REQUEST)
-        if not coordinates:
-            return Response({'error': 'coordinates is required.'}, status=status.HTTP_400_BAD_REQUEST)        
-        # if not freeze:
-        #     return Response({'error': 'freeze is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        with collect_metrics() as metrics:
+            args, error = _add_room_job(data)
+            if error:
+                return Response({'error': error[0]}, status=error[1])
                
-        # Include the coordinates in the response data
-        response_data = add_new_room_main(coordinates, roomName, roomWidth, roomHeight, adjacentRoom, direction)
+            # Include the coordinates in the response data
+            response_data = add_new_room_main(*args)
+        registry.record('add_room', 'solver', metrics)
  
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(response_data, status=status.HTTP_200_OK, headers=_timings_headers(data, 'solver', metrics))
     except Exception as e:
-        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+ 
+ 
+def metrics_func(request):
+    # Prometheus scrape target for the solver metrics; only answers the addresses
+    # listed in FLOORPLAN_METRICS_ALLOWED_ADDRS
+    allowed_addrs = getattr(settings, 'FLOORPLAN_METRICS_ALLOWED_ADDRS', ('127.0.0.1', '::1'))
+    if not allowed_addrs or request.META.get('REMOTE_ADDR') not in allowed_addrs:
+        raise Http404
+    return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -54,6 +55,8 @@ MIDDLEWARE = [
 ]
 
 CORS_ALLOW_ALL_ORIGINS = True
+# Lets browsers read the timings of requests that send "timings": true
+CORS_EXPOSE_HEADERS = ["X-Floorplan-Timings"]
 
 ROOT_URLCONF = "backend_project.urls"
 
@@ -127,3 +130,62 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Worker processes for /api/generate_floorplan_batch/ (None uses one per CPU)
+FLOORPLAN_BATCH_WORKERS = None
+
+# Cache for generate_floorplan responses (see backend/result_cache.py). Use
+# {'BACKEND': 'django', 'ALIAS': ...} to keep them in one of CACHES instead,
+# or None to turn caching off.
+FLOORPLAN_RESULT_CACHE = {'BACKEND': 'local', 'MAX_ENTRIES': 256, 'TTL': 3600}
+
+# Room size constraints with per-tenant overrides (see src/constraints.py).
+# Requests pick a tenant with "tenant"; without one the shared values apply.
+FLOORPLAN_CONSTRAINTS_PATH = BASE_DIR / "src" / "room_constraints.json"
+
+# How generate_floorplan and adjust_dimension spread extra area over the rooms
+# (see src/area_solver.py): 'heuristic' grows them wall by wall in priority
+# order, 'exact' solves for all sizes at once. Requests may pick one with "areaSolver".
+FLOORPLAN_AREA_SOLVER = 'heuristic'
+
+# Plans built by `manage.py precompute_floorplans`. generate_floorplan serves
+# exact area hits from it and starts other areas from the nearest grid plan
+# within one grid step, for requests with the constraints and area solver it was
+# solved with; rebuild it after editing the constraints config. Nothing is used
+# until the file has been built.
+FLOORPLAN_PRECOMPUTED_PATH = BASE_DIR / "precomputed_floorplans.npz"
+FLOORPLAN_PRECOMPUTED_WARM_START = True
+
+# Solved plans kept between adjust_dimension calls that send a sessionToken;
+# same options as FLOORPLAN_RESULT_CACHE, None disables sessions
+FLOORPLAN_ADJUST_SESSIONS = {'BACKEND': 'local', 'MAX_ENTRIES': 128, 'TTL': 900}
+
+# Executor for the async endpoints under /api/async/ (see backend/solver_executor.py).
+# KIND is 'process' or 'thread'; WORKERS defaults to the number of CPUs. Requests
+# beyond MAX_PENDING running or queued solves get 503 with Retry-After.
+FLOORPLAN_ASYNC_EXECUTOR = {'KIND': 'process', 'WORKERS': None, 'MAX_PENDING': 32}
+
+# Solver tracing (see src/tracing.py). FLOORPLAN_TRACE_LEVEL=INFO logs the time of
+# every pipeline stage and DEBUG every solver step; the default only logs
+# requests the solver could not fully satisfy.
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "solver": {"format": "%(asctime)s %(levelname)s %(name)s %(message)s"},
+    },
+    "handlers": {
+        "solver": {"class": "logging.StreamHandler", "formatter": "solver"},
+    },
+    "loggers": {
+        "src": {
+            "handlers": ["solver"],
+            "level": os.environ.get("FLOORPLAN_TRACE_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
+}
+
+# Clients allowed to scrape /api/metrics/ (Prometheus text format); an empty
+# list turns the endpoint off
+FLOORPLAN_METRICS_ALLOWED_ADDRS = ["127.0.0.1", "::1"]
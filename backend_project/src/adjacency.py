@@ -0,0 +1,79 @@
+from src.metrics import count
+from src.wall_index import WallIndex
+
+DIRECTIONS = ('North', 'South', 'East', 'West')
+
+
+def _is_line(wall):
+    return tuple(wall[0]) != tuple(wall[1])
+
+
+def _side(wall):
+    # Side of its own room a wall faces, judged like find_adjacent_rooms does
+    (x1, y1), (x2, y2) = wall[0], wall[1]
+    if x1 == x2:
+        return 'West' if y1 < y2 else 'East'
+    elif y1 == y2:
+        return 'North' if x1 < x2 else 'South'
+    return None
+
+
+class AdjacencyGraph:
+    """Rooms sharing a stretch of wall, grouped by the side they are on.
+
+    Built once from a wall index over the plan; `sync` re-indexes only the rooms
+    whose walls changed since the last sync, so lookups stay O(degree) without
+    rescanning the plan.
+    """
+
+    def __init__(self, rooms):
+        self.order = {room: i for i, room in enumerate(rooms)}
+        self.walls = {}
+        self.edges = {}
+        for room, walls in rooms.items():
+            self.walls[room] = [(tuple(wall[0]), tuple(wall[1])) for wall in walls]
+            self.edges[room] = {direction: set() for direction in DIRECTIONS}
+        self.index = WallIndex({
+            room: {i: wall for i, wall in enumerate(walls) if _is_line(wall)} for room, walls in self.walls.items()
+        })
+        for room in self.walls:
+            self._link(room)
+        count('wall_comparisons', self.index.take_comparisons())
+
+    def _link(self, room):
+        for i, wall in enumerate(self.walls[room]):
+            if not _is_line(wall):
+                continue
+            for other_room, j in self.index.overlapping(wall, room):
+                self.edges[room][_side(wall)].add(other_room)
+                self.edges[other_room][_side(self.walls[other_room][j])].add(room)
+
+    def adjacent_rooms(self, room):
+        # Same layout as find_adjacent_rooms: {'North': [...], 'South': [...], ...}
+        return {direction: sorted(neighbours, key=self.order.get) for direction, neighbours in self.edges[room].items()}
+
+    def move_room(self, room, walls):
+        for neighbours in self.edges[room].values():
+            for other_room in neighbours:
+                for other_neighbours in self.edges[other_room].values():
+                    other_neighbours.discard(room)
+            neighbours.clear()
+
+        for i, wall in enumerate(self.walls[room]):
+            if _is_line(wall):
+                self.index.remove(wall, room, i)
+        self.walls[room] = [(tuple(wall[0]), tuple(wall[1])) for wall in walls]
+        for i, wall in enumerate(self.walls[room]):
+            if _is_line(wall):
+                self.index.add(wall, room, i)
+        self._link(room)
+        count('wall_comparisons', self.index.take_comparisons())
+
+    def sync(self, rooms):
+        # Re-index only the rooms whose walls differ from the ones already indexed
+        if list(rooms) != list(self.walls):
+            self.__init__(rooms)
+            return
+        for room, walls in rooms.items():
+            if [(tuple(wall[0]), tuple(wall[1])) for wall in walls] != self.walls[room]:
+                self.move_room(room, walls)
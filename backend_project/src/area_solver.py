@@ -0,0 +1,191 @@
+# Closed-form distribution of extra (or missing) area over the rooms that may
+# grow, the 'exact' alternative to the priority-ordered passes of
+# adjust_extra_area. The rooms' new widths W and heights H minimise the relative
+# change sum((W - w)^2 / w^2 + (H - h)^2 / h^2) subject to sum(W * H) hitting
+# the target, with every side kept within its min/max constraints and only the
+# sides whose walls are free allowed to move. For a Lagrange multiplier `lam`
+# the optimum of each room is closed-form:
+#   both sides free: W = w / (1 - lam*a), H = h / (1 - lam*a)   (a = w * h)
+#   width only:      W = w * (1 + lam*a)
+#   height only:     H = h * (1 + lam*a)
+# clipped to the bounds. The total area is monotone in `lam`, so a bisection
+# over that one scalar (vectorised over all rooms) finds the multiplier that
+# reaches the target. Moving only free walls keeps every shared wall in place,
+# so adjacent rooms need no coupling constraints.
+import numpy as np
+
+from src.room_ids import room_type
+
+AREA_SOLVERS = ('heuristic', 'exact')
+
+_BISECTION_STEPS = 200
+
+# Sides tried for taking up the rounding error, and hundredths each is moved either way
+_ROUNDING_SIDES = 8
+_ROUNDING_STEPS = 5
+
+
+def _sides(lam, widths, heights, areas, free_width, free_height, bounds):
+    min_w, max_w, min_h, max_h = bounds
+    both = free_width & free_height
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scale = np.where(both, 1.0 / (1.0 - lam * areas), 1.0)
+    linear = 1.0 + lam * areas
+    new_w = np.where(both, widths * scale, np.where(free_width, widths * linear, widths))
+    new_h = np.where(both, heights * scale, np.where(free_height, heights * linear, heights))
+    return np.clip(new_w, min_w, max_w), np.clip(new_h, min_h, max_h)
+
+
+def distribute_area(widths, heights, min_widths, max_widths, min_heights, max_heights, free_width, free_height, target_area, tolerance=1e-9):
+    """New (widths, heights) arrays whose areas add up to `target_area`, and whether it was reached.
+
+    All arguments but `target_area` are per-room sequences. A side outside
+    its bounds already is left where it is unless the solution moves it
+    back in. When the bounds do not allow the target, the sides end at
+    the bound nearest to it.
+    """
+    widths = np.asarray(widths, dtype=float)
+    heights = np.asarray(heights, dtype=float)
+    free_width = np.asarray(free_width, dtype=bool)
+    free_height = np.asarray(free_height, dtype=bool)
+    bounds = (
+        np.minimum(np.asarray(min_widths, dtype=float), widths),
+        np.maximum(np.asarray(max_widths, dtype=float), widths),
+        np.minimum(np.asarray(min_heights, dtype=float), heights),
+        np.maximum(np.asarray(max_heights, dtype=float), heights),
+    )
+    areas = widths * heights
+
+    def total(lam):
+        new_w, new_h = _sides(lam, widths, heights, areas, free_width, free_height, bounds)
+        return float(np.dot(new_w, new_h))
+
+    difference = target_area - float(areas.sum())
+    movable = (free_width | free_height) & (areas > 0)
+    if abs(difference) <= tolerance or not movable.any():
+        return widths, heights, abs(difference) <= tolerance
+
+    # Bracket the multiplier: one end at 0 (no change), the other doubled until
+    # it passes the target. Rooms free on both sides blow up at lam = 1 / a.
+    both = free_width & free_height & movable
+    limit = 1.0 / areas[both].max() if both.any() else np.inf
+    step = 1.0 / areas[movable].max()
+    if difference > 0:
+        low, high = 0.0, min(step, limit / 2)
+        while total(high) < target_area and high < limit * (1 - 1e-12):
+            high = min(high * 2, (high + limit) / 2) if np.isfinite(limit) else high * 2
+            if high > 1e12:
+                break
+    else:
+        low, high = -step, 0.0
+        while total(low) > target_area and low > -1e12:
+            low *= 2
+
+    for _ in range(_BISECTION_STEPS):
+        middle = (low + high) / 2
+        value = total(middle)
+        if abs(value - target_area) <= tolerance:
+            low = high = middle
+            break
+        if value < target_area:
+            low = middle
+        else:
+            high = middle
+    lam = high if difference > 0 else low
+    new_w, new_h = _sides(lam, widths, heights, areas, free_width, free_height, bounds)
+    return new_w, new_h, abs(float(np.dot(new_w, new_h)) - target_area) <= max(tolerance, 1e-6 * abs(target_area))
+
+
+def room_size(room_data):
+    # (width, height) of a room. Coordinates are kept in hundredths, so the sides
+    # are rounded to them; truncating would turn 39.04 - 30.14 into 8.89
+    xs = [point[0] for wall in room_data.values() for point in wall['coordinates']]
+    ys = [point[1] for wall in room_data.values() for point in wall['coordinates']]
+    return round(max(xs) - min(xs), 2), round(max(ys) - min(ys), 2)
+
+
+def _is_free(room_data, directions):
+    # Same test as geometry.is_direction_free, for either of `directions`
+    return any(
+        all(wall.get('is_free', True) for wall in room_data.values() if wall['direction'] == direction)
+        for direction in directions
+    )
+
+
+def solve_extra_area(metadata, constraints, fixed_room_dimensions, target_total_area, room_types, rounding):
+    """New {room: (width, height)} for the rooms of `room_types` so the plan reaches `target_total_area`.
+
+    Rooms with fixed dimensions or without constraints keep their size, as
+    in adjust_extra_area. Sides are rounded with `rounding` and the rounding
+    error is taken up by up to two more sides, so the plan usually lands
+    within a hundredth of a square foot of the target. Only rooms whose size
+    changes are returned.
+    """
+    adjustable = [
+        room for room in metadata
+        if room not in fixed_room_dimensions and room_type(room) in room_types and room in constraints
+    ]
+    if not adjustable:
+        return {}
+    other_area = sum(next(iter(room_data.values()))['room_area'] for room, room_data in metadata.items() if room not in adjustable)
+    sizes = np.array([room_size(metadata[room]) for room in adjustable], dtype=float)
+    records = [constraints[room] for room in adjustable]
+    free_width = np.array([_is_free(metadata[room], ('East', 'West')) for room in adjustable])
+    free_height = np.array([_is_free(metadata[room], ('North', 'South')) for room in adjustable])
+    target = target_total_area - other_area
+
+    new_w, new_h, _ = distribute_area(
+        sizes[:, 0], sizes[:, 1],
+        [record.min_width for record in records], [record.max_width for record in records],
+        [record.min_height for record in records], [record.max_height for record in records],
+        free_width, free_height, target,
+    )
+    new_w = np.array([rounding(float(value)) for value in new_w])
+    new_h = np.array([rounding(float(value)) for value in new_h])
+
+    # Take up the rounding error with free sides. One side moves the area in
+    # steps of its other side times a hundredth, so it is paired with a second
+    # side: the first is tried a few hundredths either way and the second takes
+    # up what is left. Only the sides with the shortest other sides are tried.
+    solved = np.stack([new_w, new_h], axis=1)
+    options = []
+    for i, record in enumerate(records):
+        if free_width[i]:
+            options.append((solved[i, 1], i, 0, min(record.min_width, sizes[i, 0]), max(record.max_width, sizes[i, 0])))
+        if free_height[i]:
+            options.append((solved[i, 0], i, 1, min(record.min_height, sizes[i, 1]), max(record.max_height, sizes[i, 1])))
+    options = [option[1:] for option in sorted(options) if option[0] > 0][:_ROUNDING_SIDES]
+
+    residual = target - float(np.dot(new_w, new_h))
+    best_error, best_moves = abs(residual), ()
+    for i, axis, low, high in options:
+        for step in range(-_ROUNDING_STEPS, _ROUNDING_STEPS + 1):
+            first = round(float(solved[i, axis]) + step / 100, 2)
+            if not low <= first <= high:
+                continue
+            room_sides = solved[i].copy()
+            room_sides[axis] = first
+            left = residual - float(room_sides[0] * room_sides[1] - solved[i, 0] * solved[i, 1])
+            if abs(left) < best_error:
+                best_error, best_moves = abs(left), ((i, axis, first),)
+            for j, other_axis, other_low, other_high in options:
+                if (j, other_axis) == (i, axis):
+                    continue
+                other_sides = room_sides.copy() if j == i else solved[j].copy()
+                before = float(other_sides[0] * other_sides[1])
+                second = rounding(float(other_sides[other_axis] + left / other_sides[1 - other_axis]))
+                if not other_low <= second <= other_high:
+                    continue
+                other_sides[other_axis] = second
+                error = abs(left - (float(other_sides[0] * other_sides[1]) - before))
+                if error < best_error:
+                    best_error, best_moves = error, ((i, axis, first), (j, other_axis, second))
+    for i, axis, value in best_moves:
+        solved[i, axis] = value
+    new_w, new_h = solved[:, 0], solved[:, 1]
+
+    return {
+        room: (float(new_w[i]), float(new_h[i]))
+        for i, room in enumerate(adjustable)
+        if new_w[i] != sizes[i, 0] or new_h[i] != sizes[i, 1]
+    }
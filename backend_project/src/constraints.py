@@ -0,0 +1,154 @@
+# Room size constraints. They are kept in a JSON config file (room_constraints.json
+# by default):
+#   {"rooms":   {room type: {field: value, ...}, ...},
+#    "tenants": {tenant: {room type: {field: value, ...}, ...}, ...}}
+# Fields are min_width and min_height (required), max_width and max_height
+# (default: none) and cap_width and cap_height. The caps stop stitching from
+# stretching a room past them (used for washrooms). A tenant's entries override
+# single fields of the shared ones or add room types. `compile_constraints`
+# validates the config and builds one RoomConstraints record per room type.
+# Then `ConstraintTable.resolve` maps each room id of a plan to its record once
+# per solve, so the solver loops only read attributes.
+import hashlib
+import json
+import math
+import os
+from functools import lru_cache
+
+from src.room_ids import room_type
+
+DEFAULT_CONSTRAINTS_PATH = os.path.join(os.path.dirname(__file__), 'room_constraints.json')
+
+REQUIRED_FIELDS = ('min_width', 'min_height')
+OPTIONAL_FIELDS = ('max_width', 'max_height', 'cap_width', 'cap_height')
+
+
+class ConstraintConfigError(ValueError):
+    pass
+
+
+class RoomConstraints:
+    """Size limits of one room type; a missing max is inf and a missing cap None."""
+
+    __slots__ = ('min_width', 'min_height', 'max_width', 'max_height', 'cap_width', 'cap_height')
+
+    def __init__(self, min_width=0, min_height=0, max_width=math.inf, max_height=math.inf, cap_width=None, cap_height=None):
+        self.min_width = min_width
+        self.min_height = min_height
+        self.max_width = max_width
+        self.max_height = max_height
+        self.cap_width = cap_width
+        self.cap_height = cap_height
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'RoomConstraints({fields})'
+
+
+# For rooms whose type has no entry
+UNCONSTRAINED = RoomConstraints()
+
+
+class ConstraintTable:
+    """The compiled constraints of one tenant, by room type.
+
+    `digest` identifies the values, for cache keys and sessions.
+    """
+
+    __slots__ = ('tenant', 'records', 'digest')
+
+    def __init__(self, tenant, records, digest):
+        self.tenant = tenant
+        self.records = records
+        self.digest = digest
+
+    def __contains__(self, type_name):
+        return type_name in self.records
+
+    def get(self, type_name, default=None):
+        return self.records.get(type_name, default)
+
+    def resolve(self, room_ids):
+        # {room id: RoomConstraints} for the rooms whose type has constraints
+        records = self.records
+        return {room: records[room_type(room)] for room in room_ids if room_type(room) in records}
+
+
+def _number(value, where):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise ConstraintConfigError(f"{where} must be a non-negative number, got {value!r}.")
+    return value
+
+
+def _compile_record(fields, where):
+    if not isinstance(fields, dict):
+        raise ConstraintConfigError(f"{where} must be an object.")
+    unknown = set(fields) - set(REQUIRED_FIELDS) - set(OPTIONAL_FIELDS)
+    if unknown:
+        raise ConstraintConfigError(f"{where} has unknown fields: {', '.join(sorted(unknown))}.")
+    for name in REQUIRED_FIELDS:
+        if name not in fields:
+            raise ConstraintConfigError(f"{where} is missing {name}.")
+    values = {name: _number(value, f'{where}.{name}') for name, value in fields.items()}
+    record = RoomConstraints(**values)
+    for axis in ('width', 'height'):
+        low = getattr(record, f'min_{axis}')
+        for bound in (f'max_{axis}', f'cap_{axis}'):
+            high = getattr(record, bound)
+            if high is not None and high < low:
+                raise ConstraintConfigError(f"{where}.{bound} ({high}) is below min_{axis} ({low}).")
+    return record
+
+
+def compile_constraints(config, tenant=None):
+    """Validate `config` and build the ConstraintTable of `tenant` (None: no overrides).
+
+    Raises ConstraintConfigError for a malformed config or an unknown tenant.
+    """
+    if not isinstance(config, dict) or not isinstance(config.get('rooms'), dict):
+        raise ConstraintConfigError("The constraints config needs a 'rooms' object.")
+    tenants = config.get('tenants') or {}
+    if not isinstance(tenants, dict):
+        raise ConstraintConfigError("'tenants' must be an object.")
+
+    entries = {type_name: dict(fields) if isinstance(fields, dict) else fields for type_name, fields in config['rooms'].items()}
+    if tenant is not None:
+        if tenant not in tenants:
+            raise ConstraintConfigError(f"Unknown tenant {tenant!r}.")
+        overrides = tenants[tenant]
+        if not isinstance(overrides, dict):
+            raise ConstraintConfigError(f"tenants.{tenant} must be an object.")
+        for type_name, fields in overrides.items():
+            if not isinstance(fields, dict):
+                raise ConstraintConfigError(f"tenants.{tenant}.{type_name} must be an object.")
+            base = entries.get(type_name)
+            entries[type_name] = {**base, **fields} if isinstance(base, dict) else dict(fields)
+
+    records = {}
+    for type_name, fields in entries.items():
+        where = f'tenants.{tenant}.{type_name}' if tenant is not None and type_name in tenants[tenant] else f'rooms.{type_name}'
+        records[type_name] = _compile_record(fields, where)
+    encoded = json.dumps(entries, sort_keys=True, separators=(',', ':')).encode()
+    return ConstraintTable(tenant, records, hashlib.sha256(encoded).hexdigest())
+
+
+def compile_all(config):
+    # Every table of the config: {None: shared table, tenant: tenant table, ...}
+    tables = {None: compile_constraints(config)}
+    for tenant in config.get('tenants') or {}:
+        tables[tenant] = compile_constraints(config, tenant)
+    return tables
+
+
+def load_constraints_config(path=DEFAULT_CONSTRAINTS_PATH):
+    with open(path) as f:
+        try:
+            return json.load(f)
+        except json.JSONDecodeError as e:
+            raise ConstraintConfigError(f"{path} is not valid JSON: {e}") from e
+
+
+@lru_cache(maxsize=None)
+def default_constraint_table():
+    # The shared table of the shipped config, for engine calls that do not pass one
+    return compile_constraints(load_constraints_config())
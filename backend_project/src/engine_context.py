@@ -0,0 +1,28 @@
+from src.area_solver import AREA_SOLVERS
+from src.constraints import default_constraint_table
+
+class EngineContext:
+    """State of one engine run: the input plan, its metadata model and the constraints.
+
+    Every request builds its own context and passes it down, so concurrent
+    requests served by threads of one process never share mutable engine state.
+    `constraints` maps each room id to its RoomConstraints (see constraints.py)
+    and `area_solver` names how leftover area is spread (see area_solver.py).
+    """
+
+    def __init__(self, rooms, constraints, area_solver='heuristic'):
+        self.rooms = rooms
+        self.constraints = constraints
+        self.area_solver = area_solver
+        self.plan = None
+
+    @property
+    def metadata(self):
+        return None if self.plan is None else self.plan.metadata
+
+def make_context(rooms, constraints=None, area_solver='heuristic'):
+    # `constraints` is a ConstraintTable; without one the shipped constraints apply
+    if area_solver not in AREA_SOLVERS:
+        raise ValueError(f"Unknown area solver {area_solver!r}; choose from {', '.join(AREA_SOLVERS)}.")
+    table = constraints if constraints is not None else default_constraint_table()
+    return EngineContext(rooms, table.resolve(rooms), area_solver)
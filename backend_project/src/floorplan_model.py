@@ -0,0 +1,130 @@
+from src.metrics import count
+from src.room_record import RoomRecord
+from src.wall_index import WallIndex
+
+
+class FloorPlanModel:
+    """Room metadata that is kept up to date across edits instead of rebuilt.
+
+    `metadata` has the same layout as the dict built by make_roomdata. After the
+    solver edits wall coordinates (directly in `metadata` or in a rooms dict taken
+    from it), `sync(rooms)` finds the walls that moved since the last sync and only
+    recomputes their rooms and the `is_free` flags of walls touching their old or
+    new position. `calculate_room_area` and `calculate_wall_length` are the
+    engine's own helpers so each engine keeps its rounding. `records` keeps a
+    RoomRecord per room with its bounds, area and wall directions.
+    """
+
+    def __init__(self, rooms, calculate_room_area, calculate_wall_length):
+        self.calculate_room_area = calculate_room_area
+        self.calculate_wall_length = calculate_wall_length
+        self.rebuild_count = 0
+        self.sync_count = 0
+        self.moved_walls = []
+        self.metadata = {}
+        self.rebuild(rooms)
+
+    def rooms(self):
+        return {room: [data['coordinates'] for wall_id, data in walls.items()] for room, walls in self.metadata.items()}
+
+    def rebuild(self, rooms):
+        self.rebuild_count += 1
+        count('floorplan_rebuilds')
+        self.metadata.clear()
+        self.records = {}
+        self._snapshot = {}
+        self._lengths = {}
+        wall_counter = 1  # Unique identifier for each wall across all rooms
+
+        for room, walls in rooms.items():
+            coordinates = [[list(wall[0]), list(wall[1])] for wall in walls]
+            record = self.records[room] = RoomRecord(coordinates, self.calculate_room_area, self.calculate_wall_length)
+            room_walls = self.metadata[room] = {}
+            wall_numbers = {'horizontal': [], 'vertical': []}  # Separate wall numbers by type
+
+            for i, (start, end) in enumerate(coordinates):
+                wall_numbers[record.wall_types[i]].append(wall_counter)
+                room_walls[wall_counter] = {
+                    'wall_length': record.wall_lengths[i],
+                    'wall_type': record.wall_types[i],
+                    'coordinates': [start, end],
+                    'room_area': record.area,
+                    'parallel_walls': [],
+                    'is_free': True,
+                    'direction': record.directions[i]
+                }
+                self._snapshot[wall_counter] = (tuple(start), tuple(end))
+                self._lengths[wall_counter] = record.wall_lengths[i]
+                wall_counter += 1
+
+            # Assign parallel wall numbers within each wall type
+            for numbers in wall_numbers.values():
+                for number in numbers:
+                    room_walls[number]['parallel_walls'] = numbers
+
+        self.index = WallIndex({room: {wall_id: self._snapshot[wall_id] for wall_id in walls} for room, walls in self.metadata.items()})
+        for room, room_walls in self.metadata.items():
+            for wall_id, data in room_walls.items():
+                data['is_free'] = self.index.is_free(data['coordinates'], room)
+        count('wall_comparisons', self.index.take_comparisons())
+        return self.metadata
+
+    def _refresh_room(self, room):
+        room_walls = self.metadata[room]
+        coordinates = [data['coordinates'] for data in room_walls.values()]
+        record = self.records[room] = RoomRecord(coordinates, self.calculate_room_area, self.calculate_wall_length)
+        wall_numbers = {'horizontal': [], 'vertical': []}
+
+        for i, (wall_id, data) in enumerate(room_walls.items()):
+            data['wall_length'] = self._lengths[wall_id] = record.wall_lengths[i]
+            data['wall_type'] = record.wall_types[i]
+            data['room_area'] = record.area
+            data['direction'] = record.directions[i]
+            wall_numbers[data['wall_type']].append(wall_id)
+
+        for numbers in wall_numbers.values():
+            for number in numbers:
+                room_walls[number]['parallel_walls'] = numbers
+
+    def sync(self, rooms=None):
+        if rooms is None:
+            rooms = self.rooms()
+        self.sync_count += 1
+        count('floorplan_syncs')
+
+        # Rooms added, removed or reshaped change the wall numbering, so start over
+        if list(rooms) != list(self.metadata) or any(len(walls) != len(self.metadata[room]) for room, walls in rooms.items()):
+            self.moved_walls = [(room, wall_id) for room, walls in self.metadata.items() for wall_id in walls]
+            return self.rebuild(rooms)
+
+        self.moved_walls = []
+        for room, walls in rooms.items():
+            for wall_id, wall in zip(self.metadata[room], walls):
+                # Fresh lists, so later edits to `rooms` do not leak into the metadata
+                start, end = list(wall[0]), list(wall[1])
+                data = self.metadata[room][wall_id]
+                data['coordinates'] = [start, end]
+                # A length written by an edit helper with its own rounding also needs recomputing
+                if (tuple(start), tuple(end)) != self._snapshot[wall_id] or data['wall_length'] != self._lengths[wall_id]:
+                    self.moved_walls.append((room, wall_id))
+
+        stale_walls = set(self.moved_walls)
+        for room, wall_id in self.moved_walls:
+            self.index.remove(self._snapshot[wall_id], room, wall_id)
+        for room, wall_id in self.moved_walls:
+            stale_walls.update(self.index.overlapping(self._snapshot[wall_id], room))
+        for room, wall_id in self.moved_walls:
+            start, end = self.metadata[room][wall_id]['coordinates']
+            self._snapshot[wall_id] = (tuple(start), tuple(end))
+            self.index.add(self._snapshot[wall_id], room, wall_id)
+        for room, wall_id in self.moved_walls:
+            stale_walls.update(self.index.overlapping(self._snapshot[wall_id], room))
+
+        for room in {room for room, wall_id in self.moved_walls}:
+            self._refresh_room(room)
+        for room, wall_id in stale_walls:
+            data = self.metadata[room][wall_id]
+            data['is_free'] = self.index.is_free(data['coordinates'], room)
+        count('walls_moved', len(self.moved_walls))
+        count('wall_comparisons', self.index.take_comparisons())
+        return self.metadata
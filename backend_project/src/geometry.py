@@ -0,0 +1,205 @@
+# Geometry shared by the floor plan engines (test_area, adjust_dimension and
+# new_room_placement). The engines differ only in how they round to two decimals:
+# test_area rounds, the other two truncate. Functions that round take that
+# choice as `rounding`, so a faster implementation here lands in every endpoint.
+from functools import partial
+
+import numpy as np
+
+from src.adjacency import AdjacencyGraph
+from src.floorplan_model import FloorPlanModel
+from src.snapping import merge_near_coordinates, snap_near_values
+from src.wall_index import find_common_walls
+
+def round_to_two_decimals(value):
+    return round(value, 2)
+
+def truncate_to_two_decimals(value):
+    return int(value * 100) / 100.0
+
+# Element-wise versions of the two for NumPy arrays, giving the same values
+def round_array_to_two_decimals(values):
+    return np.round(values, 2)
+
+def truncate_array_to_two_decimals(values):
+    return np.trunc(values * 100) / 100.0
+
+ARRAY_ROUNDING = {
+    round_to_two_decimals: round_array_to_two_decimals,
+    truncate_to_two_decimals: truncate_array_to_two_decimals,
+}
+
+def calculate_wall_length(start, end, rounding=round_to_two_decimals):
+    return rounding(((end[0] - start[0])**2 + (end[1] - start[1])**2)**0.5)
+
+def determine_wall_type(start, end):
+    if start[0] == end[0]:
+        return 'vertical'
+    elif start[1] == end[1]:
+        return 'horizontal'
+    else:
+        return 'diagonal'
+
+def calculate_area(coordinates, rounding=round_to_two_decimals):
+    x_coords = [point[0] for point in coordinates]
+    y_coords = [point[1] for point in coordinates]
+    return rounding(0.5 * abs(sum(x * y for x, y in zip(x_coords, y_coords[1:] + y_coords[:1])) - sum(y * x for x, y in zip(x_coords[1:] + x_coords[:1], y_coords))))
+
+def calculate_room_area(walls, rounding=round_to_two_decimals):
+    return rounding(calculate_area([wall[0] for wall in walls], rounding))
+
+# Function to check for overlaps between wall segments
+def check_overlap(w1, w2):
+    # Sort the points to simplify the logic
+    w1 = sorted(w1)
+    w2 = sorted(w2)
+
+    # Check for vertical overlap
+    if w1[0][0] == w1[1][0] == w2[0][0] == w2[1][0]:  # All x are the same
+        return not (w1[1][1] <= w2[0][1] or w2[1][1] <= w1[0][1])
+    # Check for horizontal overlap
+    elif w1[0][1] == w1[1][1] == w2[0][1] == w2[1][1]:  # All y are the same
+        return not (w1[1][0] <= w2[0][0] or w2[1][0] <= w1[0][0])
+    return False
+
+def is_overlapping_or_touching(line1, line2):
+    (x1_start, y1_start), (x1_end, y1_end) = line1
+    (x2_start, y2_start), (x2_end, y2_end) = line2
+
+    if x1_start == x1_end == x2_start == x2_end:  # Vertical lines
+        return max(min(y1_start, y1_end), min(y2_start, y2_end)) < min(max(y1_start, y1_end), max(y2_start, y2_end))
+    elif y1_start == y1_end == y2_start == y2_end:  # Horizontal lines
+        return max(min(x1_start, x1_end), min(x2_start, x2_end)) < min(max(x1_start, x1_end), max(x2_start, x2_end))
+    return False
+
+def is_overlapping_or_touching1(line1, line2):
+    (x1_start, y1_start), (x1_end, y1_end) = line1
+    (x2_start, y2_start), (x2_end, y2_end) = line2
+
+    if x1_start == x1_end == x2_start == x2_end:  # Vertical lines
+        if max(min(y1_start, y1_end), min(y2_start, y2_end)) < min(max(y1_start, y1_end), max(y2_start, y2_end)):
+            return True
+    elif y1_start == y1_end == y2_start == y2_end:  # Horizontal lines
+        if max(min(x1_start, x1_end), min(x2_start, x2_end)) < min(max(x1_start, x1_end), max(x2_start, x2_end)):
+            return True
+    return False
+
+def is_wall_free(coords, room_name, rooms):
+    for other_room, walls in rooms.items():
+        if other_room != room_name:
+            for wall in walls:
+                if check_overlap(coords, wall):
+                    return False
+    return True
+
+def get_direction(start, end, room_min_x, room_max_x, room_min_y, room_max_y):
+    if start[1] == end[1]:  # Horizontal line
+        if start[1] == room_max_y:
+            return 'North'
+        elif start[1] == room_min_y:
+            return 'South'
+    elif start[0] == end[0]:  # Vertical line
+        if start[0] == room_min_x:
+            return 'West'
+        elif start[0] == room_max_x:
+            return 'East'
+    return 'Unknown'
+
+def make_floorplan_model(rooms, rounding=round_to_two_decimals):
+    return FloorPlanModel(rooms, partial(calculate_room_area, rounding=rounding), partial(calculate_wall_length, rounding=rounding))
+
+def make_roomdata(rooms, rounding=round_to_two_decimals):
+    return make_floorplan_model(rooms, rounding).metadata
+
+def calculate_total_area(metadata):
+    total_area = 0
+    for room_data in metadata.values():
+        for wall_data in room_data.values():
+            # Add the area of each room once to the total
+            total_area += wall_data['room_area']
+            break  # Break after the first wall to avoid multiple additions of the same room area
+    return total_area
+
+def is_direction_free(room, direction, metadata):
+    for wall_number, data in metadata[room].items():
+        if data['direction'] == direction:
+            # Assuming we have a way to check if the wall is free, such as an attribute 'is_free'
+            if not data.get('is_free', True):
+                return False
+    return True
+
+def opposite_direction(direction):
+    opposites = {'North': 'South', 'South': 'North', 'East': 'West', 'West': 'East'}
+    return opposites[direction]
+
+def find_adjacent_rooms(room_name, rooms):
+    return AdjacencyGraph(rooms).adjacent_rooms(room_name)
+
+def replace_near_values(rooms, threshold=0.9, rounding=None):
+    return snap_near_values(rooms, threshold, rounding)
+
+def adjust_coordinates(rooms, threshold=0.2, rounding=round_to_two_decimals):
+    return merge_near_coordinates(rooms, threshold, rounding)
+
+def get_room_lines(room_name, room_data):
+    return room_data.get(room_name, [])
+
+def find_and_display_common_walls(room_data):
+    return find_common_walls(room_data)
+
+def flatten_to_array(coordinates):
+    return np.array([coord for pair in coordinates for coord in pair]).reshape(-1, 2)
+
+def create_connection_matrix(rooms):
+    connection_matrix = {}
+    for room1, coords1 in rooms.items():
+        connection_matrix[room1] = []
+        for room2, coords2 in rooms.items():
+            if room1 != room2:
+                connected = False
+                for c1 in coords1:
+                    for c2 in coords2:
+                        if (
+                            # Check horizontal overlap
+                            (min(c1[0][1], c1[1][1]) <= max(c2[0][1], c2[1][1]) <= max(c1[0][1], c1[1][1]) or
+                             min(c2[0][1], c2[1][1]) <= max(c1[0][1], c1[1][1]) <= max(c2[0][1], c2[1][1])) and
+                            # Check vertical overlap
+                            (min(c1[0][0], c1[1][0]) <= max(c2[0][0], c2[1][0]) <= max(c1[0][0], c1[1][0]) or
+                             min(c2[0][0], c2[1][0]) <= max(c1[0][0], c1[1][0]) <= max(c2[0][0], c2[1][0]))
+                        ):
+                            connected = True
+                            break
+                    if connected:
+                        connection_matrix[room1].append(room2)
+                        break
+    return connection_matrix
+
+def analyze_wall_changes(plan1, plan2):
+    results = []  # Single list for all significant changes
+
+    # Check each room pair in the first plan
+    for room_pair, walls_plan1 in plan1.items():
+        walls_plan2 = plan2.get(room_pair)
+
+        # If no matching room pair in the second plan, it's a lost connection
+        if not walls_plan2:
+            results.append(room_pair)  # Add missing room pairs to the list
+            continue
+
+        # Initialize flag to detect axis changes
+        has_axis_change = False
+
+        # Collect all walls from both plans for comparison
+        walls1_orientations = set("Vertical" if x1 == x2 else "Horizontal" 
+                                  for (x1, y1), (x2, y2) in (wall[0] for wall in walls_plan1))
+        walls2_orientations = set("Vertical" if x1 == x2 else "Horizontal" 
+                                  for (x1, y1), (x2, y2) in (wall[0] for wall in walls_plan2))
+
+        # Check for axis changes
+        if walls1_orientations != walls2_orientations:
+            has_axis_change = True
+
+        if has_axis_change:
+            results.append(room_pair)  # Add changed room pairs to the list
+
+    return results
@@ -0,0 +1,141 @@
+# Per-stage timers and counters for the floor plan engines. While a request runs
+# inside `collect_metrics()`, every `span` (see tracing.py) adds its elapsed time
+# to the request's StageMetrics and `count` bumps its counters. Outside of one
+# both are no-ops. Finished requests are summed into `registry`, which the
+# metrics endpoint reports.
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current = ContextVar('floorplan_metrics', default=None)
+
+
+class StageMetrics:
+    """Timers and counters of one request.
+
+    `stages` maps a stage name to [calls, seconds] and `counters` a counter
+    name to its value; `elapsed` is the time spent inside collect_metrics.
+    """
+
+    __slots__ = ('stages', 'counters', 'elapsed')
+
+    def __init__(self):
+        self.stages = {}
+        self.counters = {}
+        self.elapsed = 0.0
+
+    def add_stage(self, name, seconds):
+        stage = self.stages.get(name)
+        if stage is None:
+            self.stages[name] = [1, seconds]
+        else:
+            stage[0] += 1
+            stage[1] += seconds
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, other):
+        # Adds the stages and counters of `other`, e.g. a solve run in a worker
+        for name, (calls, seconds) in other.stages.items():
+            stage = self.stages.setdefault(name, [0, 0.0])
+            stage[0] += calls
+            stage[1] += seconds
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def as_dict(self):
+        return {
+            'total_ms': round(self.elapsed * 1000, 3),
+            'stages': {name: {'calls': calls, 'ms': round(seconds * 1000, 3)} for name, (calls, seconds) in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+
+
+def current_metrics():
+    return _current.get()
+
+
+def count(name, n=1):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.count(name, n)
+
+
+@contextmanager
+def collect_metrics():
+    metrics = StageMetrics()
+    token = _current.set(metrics)
+    start = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.elapsed = time.perf_counter() - start
+        _current.reset(token)
+
+
+class MetricsRegistry:
+    """Process-wide totals of the requests handled so far, by pipeline."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        self.requests = {}  # (pipeline, source) -> [count, seconds]
+        self.stages = {}  # stage -> [calls, seconds]
+        self.counters = {}  # (pipeline, counter) -> value
+
+    def record(self, pipeline, source, metrics):
+        with self._lock:
+            request = self.requests.setdefault((pipeline, source), [0, 0.0])
+            request[0] += 1
+            request[1] += metrics.elapsed
+            for name, (calls, seconds) in metrics.stages.items():
+                stage = self.stages.setdefault(name, [0, 0.0])
+                stage[0] += calls
+                stage[1] += seconds
+            for name, value in metrics.counters.items():
+                self.counters[(pipeline, name)] = self.counters.get((pipeline, name), 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return (
+                {key: tuple(value) for key, value in self.requests.items()},
+                {key: tuple(value) for key, value in self.stages.items()},
+                dict(self.counters),
+            )
+
+    def render_prometheus(self):
+        # Prometheus text exposition format
+        requests, stages, counters = self.snapshot()
+        lines = [
+            '# HELP floorplan_requests_total Requests handled, by pipeline and where the plan came from.',
+            '# TYPE floorplan_requests_total counter',
+        ]
+        lines += [f'floorplan_requests_total{{pipeline="{p}",source="{s}"}} {n}' for (p, s), (n, _) in sorted(requests.items())]
+        lines += [
+            '# HELP floorplan_request_seconds_total Time spent handling requests.',
+            '# TYPE floorplan_request_seconds_total counter',
+        ]
+        lines += [f'floorplan_request_seconds_total{{pipeline="{p}",source="{s}"}} {t:.6f}' for (p, s), (_, t) in sorted(requests.items())]
+        lines += [
+            '# HELP floorplan_stage_calls_total Times each solver stage ran.',
+            '# TYPE floorplan_stage_calls_total counter',
+        ]
+        lines += [f'floorplan_stage_calls_total{{stage="{name}"}} {n}' for name, (n, _) in sorted(stages.items())]
+        lines += [
+            '# HELP floorplan_stage_seconds_total Time spent in each solver stage.',
+            '# TYPE floorplan_stage_seconds_total counter',
+        ]
+        lines += [f'floorplan_stage_seconds_total{{stage="{name}"}} {t:.6f}' for name, (_, t) in sorted(stages.items())]
+        lines += [
+            '# HELP floorplan_solver_events_total Solver work counters (wall comparisons, metadata rebuilds, ...).',
+            '# TYPE floorplan_solver_events_total counter',
+        ]
+        lines += [f'floorplan_solver_events_total{{pipeline="{p}",counter="{name}"}} {n}' for (p, name), n in sorted(counters.items())]
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
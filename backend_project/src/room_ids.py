@@ -0,0 +1,28 @@
+# Room ids. A plan maps each room id to its walls, and ids must be unique within
+# the plan. An id is the room type, optionally followed by '#' and a unit label:
+# 'Kitchen' and 'Bedroom' in a single flat, or 'Kitchen#3' and 'Bedroom#3' for
+# the third flat on a floor. The type selects the room's constraints and its
+# special handling (the master bedroom suite, washroom size limits, which rooms
+# take extra area), and rooms with the same label belong to the same flat, so a
+# whole floor can be solved in one call.
+ROOM_ID_SEPARATOR = '#'
+
+
+def room_type(room_id):
+    # 'Master Bedroom#2' -> 'Master Bedroom'
+    return room_id.partition(ROOM_ID_SEPARATOR)[0]
+
+
+def room_unit(room_id):
+    # 'Master Bedroom#2' -> '2'; None for an id without a unit
+    _, separator, unit = room_id.partition(ROOM_ID_SEPARATOR)
+    return unit if separator else None
+
+
+def make_room_id(type_name, unit=None):
+    return type_name if unit is None else f'{type_name}{ROOM_ID_SEPARATOR}{unit}'
+
+
+def unit_room(room_id, type_name):
+    # Id of the room of `type_name` in the same flat as `room_id`
+    return make_room_id(type_name, room_unit(room_id))
@@ -0,0 +1,50 @@
+from array import array
+
+
+class RoomRecord:
+    """One rectangular room as a flat coordinate array plus its derived geometry.
+
+    `coords` holds x1, y1, x2, y2 for every wall in order. Bounds are found in a
+    single pass over the walls, and area, wall lengths, wall types and directions
+    are computed once when the record is built.
+    """
+
+    __slots__ = ('coords', 'min_x', 'max_x', 'min_y', 'max_y', 'area', 'wall_lengths', 'wall_types', 'directions')
+
+    def __init__(self, walls, calculate_room_area, calculate_wall_length):
+        coords = array('d')
+        min_x = min_y = float('inf')
+        max_x = max_y = float('-inf')
+        wall_lengths = []
+        for start, end in walls:
+            coords.extend((start[0], start[1], end[0], end[1]))
+            min_x = min(min_x, start[0], end[0])
+            max_x = max(max_x, start[0], end[0])
+            min_y = min(min_y, start[1], end[1])
+            max_y = max(max_y, start[1], end[1])
+            wall_lengths.append(calculate_wall_length(start, end))
+
+        self.coords = coords
+        self.min_x, self.max_x, self.min_y, self.max_y = min_x, max_x, min_y, max_y
+        self.area = calculate_room_area(walls)
+        self.wall_lengths = wall_lengths
+        self.wall_types = []
+        self.directions = []
+        for i in range(0, len(coords), 4):
+            x1, y1, x2, y2 = coords[i:i + 4]
+            self.wall_types.append('vertical' if x1 == x2 else 'horizontal' if y1 == y2 else 'diagonal')
+            # Same precedence as get_direction: a zero-length wall is judged as horizontal
+            if y1 == y2:
+                self.directions.append('North' if y1 == max_y else 'South' if y1 == min_y else 'Unknown')
+            elif x1 == x2:
+                self.directions.append('West' if x1 == min_x else 'East' if x1 == max_x else 'Unknown')
+            else:
+                self.directions.append('Unknown')
+
+    @property
+    def width(self):
+        return self.max_x - self.min_x
+
+    @property
+    def height(self):
+        return self.max_y - self.min_y
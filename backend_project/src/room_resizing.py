@@ -0,0 +1,563 @@
+# Room resizing shared by the two area engines, test_area (generate) and
+# adjust_dimension (adjust). As in geometry.py, functions that round take the
+# engine's choice as `rounding`. adjust_dimension also rounds the values it
+# derives from coordinates (room sizes, centroids, shift lengths, wall lengths
+# after a move); `round_results` turns that on. What still differs between the
+# engines (which rooms move together with a shifted room, and how a blocked room
+# makes space) stays in the engines, which call in here for the wall moves.
+import logging
+
+import numpy as np
+
+from src.adjacency import AdjacencyGraph
+from src.constraints import UNCONSTRAINED
+from src.geometry import (
+    ARRAY_ROUNDING, calculate_total_area, calculate_wall_length, flatten_to_array,
+    is_direction_free, opposite_direction
+)
+from src.metrics import count
+from src.room_ids import room_type
+from src.shift_analysis import ShiftDirection, ShiftRecord, analyze_room_shifts, nearest_walls, split_unshifted_room
+
+logger = logging.getLogger(__name__)
+
+def _wall_length(start, end, rounding, round_results):
+    length = calculate_wall_length(start, end, rounding)
+    return rounding(length) if round_results else length
+
+# Scaling a plan to a new total area
+def calculate_dimensions(rooms, rounding):
+    dimensions = {}
+    for room, coordinates in rooms.items():
+        width = rounding(abs(coordinates[0][0][0] - coordinates[0][1][0]))
+        height = rounding(abs(coordinates[0][0][1] - coordinates[2][0][1]))
+        dimensions[room] = {'width': width, 'height': height}
+    return dimensions
+
+def calculate_area_percentages(dimensions, rounding):
+    total_area = sum([rounding(dim['width'] * dim['height']) for dim in dimensions.values()])
+    for room, dim in dimensions.items():
+        area = rounding(dim['width'] * dim['height'])
+        dim['area'] = area
+        dim['percentage'] = rounding((area / total_area) * 100)
+    return dimensions
+
+def scale_dimensions(dimensions, new_total_area, rounding):
+    scale_factor = np.sqrt(new_total_area / sum([dim['area'] for dim in dimensions.values()]))
+    for room, dim in dimensions.items():
+        dim['scaled_width'] = rounding(dim['width'] * scale_factor)
+        dim['scaled_height'] = rounding(dim['height'] * scale_factor)
+        dim['scaled_area'] = rounding(dim['scaled_width'] * dim['scaled_height'])
+    return dimensions
+
+def recalculate_coordinates(rooms, dimensions, rounding):
+    new_rooms = {}
+    for room, coordinates in rooms.items():
+        scaled_width = dimensions[room]['scaled_width']
+        scaled_height = dimensions[room]['scaled_height']
+        x_scale = scaled_width / dimensions[room]['width']
+        y_scale = scaled_height / dimensions[room]['height']
+        new_coordinates = []
+        for coord in coordinates:
+            x1, y1 = coord[0]
+            x2, y2 = coord[1]
+            x1_new = rounding(x1 * x_scale)
+            y1_new = rounding(y1 * y_scale)
+            x2_new = rounding(x2 * x_scale)
+            y2_new = rounding(y2 * y_scale)
+            new_coordinates.append([[x1_new, y1_new], [x2_new, y2_new]])
+        new_rooms[room] = new_coordinates
+    return new_rooms
+
+# Measuring rooms and how they moved
+def calculate_centroid(coords, rounding, round_results=False):
+    x_coords = [point[0] for coord in coords for point in coord]
+    y_coords = [point[1] for coord in coords for point in coord]
+    if round_results:
+        return rounding(np.mean(x_coords)), rounding(np.mean(y_coords))
+    return np.mean(x_coords), np.mean(y_coords)
+
+def get_max_axis_shift(old_coords, new_coords, direction, rounding, round_results=False):
+    old_array = flatten_to_array(old_coords)
+    new_array = flatten_to_array(new_coords)
+    shifts = new_array - old_array
+    if 'East' in direction or 'West' in direction:
+        shift_lengths = shifts[:, 0]  # Keep the signed differences in x-axis
+    else:
+        shift_lengths = shifts[:, 1]  # Keep the signed differences in y-axis
+    max_shift_length = np.max(shift_lengths) if np.max(shift_lengths) >= abs(np.min(shift_lengths)) else np.min(shift_lengths)
+    return rounding(max_shift_length) if round_results else max_shift_length
+
+def get_shift_details(original_coords, updated_coords, rounding, round_results=False):
+    original_centroid = calculate_centroid(original_coords, rounding, round_results)
+    updated_centroid = calculate_centroid(updated_coords, rounding, round_results)
+    shift_vector = np.array(updated_centroid) - np.array(original_centroid)
+    direction = ''
+    if shift_vector[0] > 0:
+        direction += 'East'
+    elif shift_vector[0] < 0:
+        direction += 'West'
+    if shift_vector[1] > 0:
+        direction += 'North'
+    elif shift_vector[1] < 0:
+        direction += 'South'
+    shift_length = np.linalg.norm(shift_vector)
+    return direction, rounding(shift_length)
+
+def calculate_dimensions_from_metadata(room_data, rounding, round_results=False):
+    x_coords = []
+    y_coords = []
+    for wall_id, wall in room_data.items():
+        coords = wall.get('coordinates', [])
+        for coord in coords:
+            x_coords.append(coord[0])
+            y_coords.append(coord[1])
+    width = max(x_coords) - min(x_coords) if x_coords else 0
+    height = max(y_coords) - min(y_coords) if y_coords else 0
+    if round_results:
+        return rounding(width), rounding(height)
+    return width, height
+
+def find_nearest_walls(walls1, walls2, rounding, round_results=False):
+    if not round_results:
+        return nearest_walls(walls1, walls2)
+    distance, direction = nearest_walls(walls1, walls2, ARRAY_ROUNDING[rounding])
+    return rounding(distance), direction
+
+# Moving walls. A room is resized by moving the walls of one side; the engines
+# pick the side and, when no side is free, make space by shifting neighbours.
+def _target_walls(room, wall_number, metadata):
+    return [wall_id for wall_id in metadata[room] if wall_id == wall_number or wall_number in metadata[room][wall_id]['parallel_walls']]
+
+def length_change(room, wall_numbers, new_length, metadata, rounding):
+    # How far the last of the walls is from `new_length`; blocking rooms are shifted by this much
+    delta = None
+    for wall_number in wall_numbers:
+        for wall_id in _target_walls(room, wall_number, metadata):
+            start, end = metadata[room][wall_id]['coordinates']
+            delta = new_length - calculate_wall_length(start, end, rounding)
+    return delta
+
+def free_direction(room, directions, metadata):
+    for direction in directions:
+        if is_direction_free(room, direction, metadata):
+            return direction
+    return None
+
+def move_walls(room, wall_numbers, new_length, direction, metadata, rounding, round_corners=False):
+    # Stretches the walls to `new_length` towards `direction` and drags the
+    # room's other walls along; `round_corners` rounds those again after the move
+    for wall_number in wall_numbers:
+        for wall_id in _target_walls(room, wall_number, metadata):
+            data = metadata[room][wall_id]
+            start, end = data['coordinates']
+            original_start, original_end = start.copy(), end.copy()  # Save original coordinates
+            current_length = calculate_wall_length(start, end, rounding)
+            delta = new_length - current_length
+
+            if direction == 'North':
+                if start[1] > end[1]:
+                    start[1] = rounding(start[1] + delta)
+                else:
+                    end[1] = rounding(end[1] + delta)
+            elif direction == 'South':
+                if start[1] < end[1]:
+                    start[1] = rounding(start[1] - delta)
+                else:
+                    end[1] = rounding(end[1] - delta)
+            elif direction == 'East':
+                if start[0] < end[0]:
+                    end[0] = rounding(end[0] + delta)
+                else:
+                    start[0] = rounding(start[0] + delta)
+            elif direction == 'West':
+                if start[0] < end[0]:
+                    start[0] = rounding(start[0] - delta)
+                else:
+                    end[0] = rounding(end[0] - delta)
+
+            metadata[room][wall_id]['coordinates'] = (start.copy(), end.copy())
+            metadata[room][wall_id]['wall_length'] = calculate_wall_length(start, end, rounding)
+
+            # Check for adjacent walls sharing the updated coordinates within the same room
+            for wall_id2, data2 in metadata[room].items():
+                if wall_id2 != wall_id:
+                    s, e = data2['coordinates']
+                    if s == original_start:
+                        s[:] = start
+                    elif s == original_end:
+                        s[:] = end
+                    elif e == original_start:
+                        e[:] = start
+                    elif e == original_end:
+                        e[:] = end
+                    if round_corners:
+                        s = [rounding(coord) for coord in s]
+                        e = [rounding(coord) for coord in e]
+                    metadata[room][wall_id2]['coordinates'] = (s.copy(), e.copy())
+                    metadata[room][wall_id2]['wall_length'] = calculate_wall_length(s, e, rounding)
+
+def translate_room(room, direction, delta, metadata, rounding):
+    for wall_id, data in metadata[room].items():
+        start, end = data['coordinates']
+        if direction == 'North':
+            start[1] = rounding(start[1] + delta)
+            end[1] = rounding(end[1] + delta)
+        elif direction == 'South':
+            start[1] = rounding(start[1] - delta)
+            end[1] = rounding(end[1] - delta)
+        elif direction == 'East':
+            start[0] = rounding(start[0] + delta)
+            end[0] = rounding(end[0] + delta)
+        elif direction == 'West':
+            start[0] = rounding(start[0] - delta)
+            end[0] = rounding(end[0] - delta)
+        metadata[room][wall_id]['coordinates'] = (start.copy(), end.copy())
+        metadata[room][wall_id]['wall_length'] = calculate_wall_length(start, end, rounding)
+
+# Stitching: closing the gaps a resize opens between rooms that shared a wall
+def adjust_coordinates_by_direction(start, end, direction, delta, rounding):
+    if direction in ['North', 'South']:
+        index = 1  # Working on the y-axis
+        positive = (direction == 'North')
+    else:
+        index = 0  # Working on the x-axis
+        positive = (direction == 'East')
+    if positive:
+        if start[index] < end[index]:
+            end[index] = rounding(end[index] + delta)
+        else:
+            start[index] = rounding(start[index] + delta)
+    else:
+        if start[index] > end[index]:
+            end[index] = rounding(end[index] - delta)
+        else:
+            start[index] = rounding(start[index] - delta)
+
+def is_connected_to_other_room(wall_coords, metadata, current_room):
+    for room, room_data in metadata.items():
+        if room != current_room:
+            for wall_id, wall_data in room_data.items():
+                if wall_coords in [(wall_data['coordinates'][0], wall_data['coordinates'][1]), (wall_data['coordinates'][1], wall_data['coordinates'][0])]:
+                    return True
+    return False
+
+def update_adjacent_walls(metadata, room, wall_id, original_start, original_end, start, end, rounding, round_results=False):
+    for wall_id2, data2 in metadata[room].items():
+        if wall_id2 != wall_id:
+            s, e = data2['coordinates']
+            if (s == original_start or s == original_end or e == original_start or e == original_end) and not is_connected_to_other_room((s, e), metadata, room):
+                if s == original_start:
+                    s[:] = start
+                elif s == original_end:
+                    s[:] = end
+                elif e == original_start:
+                    e[:] = start
+                elif e == original_end:
+                    e[:] = end
+                s = [rounding(coord) for coord in s]
+                e = [rounding(coord) for coord in e]
+                metadata[room][wall_id2]['coordinates'] = (s.copy(), e.copy())
+                metadata[room][wall_id2]['wall_length'] = _wall_length(s, e, rounding, round_results)
+
+def _shift_parallel_walls(room, direction, delta, updated_walls, metadata, rounding, round_results):
+    wall_type = 'vertical' if direction in ['North', 'South'] else 'horizontal'
+    wall_numbers_to_update = [wall_number for wall_number, data in metadata[room].items() if data['wall_type'] == wall_type]
+    for wall_number in wall_numbers_to_update:
+        for wall_id in metadata[room]:
+            if (wall_id == wall_number or wall_number in metadata[room][wall_id]['parallel_walls']) and wall_id not in updated_walls:
+                updated_walls.add(wall_id)
+                data = metadata[room][wall_id]
+                start, end = data['coordinates']
+                original_start, original_end = start.copy(), end.copy()
+                adjust_coordinates_by_direction(start, end, direction, delta, rounding)
+                metadata[room][wall_id]['coordinates'] = (start.copy(), end.copy())
+                metadata[room][wall_id]['wall_length'] = _wall_length(start, end, rounding, round_results)
+                update_adjacent_walls(metadata, room, wall_id, original_start, original_end, start, end, rounding, round_results)
+
+def update_wall_length_by_dimension2(room, direction, delta, updated_walls, metadata, constraints, rounding, round_results=False):
+    room_data = metadata.get(room, {})
+    current_width, current_height = calculate_dimensions_from_metadata(room_data, rounding, round_results)
+    logger.debug("Current dimensions for %s - Width: %s, Height: %s", room, current_width, current_height)
+    # Get the cap for the room if it's specifically limited (washrooms).
+    room_constraints = constraints.get(room, UNCONSTRAINED)
+    # Depending on the direction, check if the update exceeds the cap.
+    if direction in ['North', 'South']:
+        if room_constraints.cap_height is not None and current_height + abs(delta) > room_constraints.cap_height:
+            logger.debug("Adjustment for %s exceeds max height %s. Adjustment not applied.", room, room_constraints.cap_height)
+            return
+    elif direction in ['East', 'West']:
+        if room_constraints.cap_width is not None and current_width + abs(delta) > room_constraints.cap_width:
+            logger.debug("Adjustment for %s exceeds max width %s. Adjustment not applied.", room, room_constraints.cap_width)
+            return
+    _shift_parallel_walls(room, direction, delta, updated_walls, metadata, rounding, round_results)
+
+def update_wall_length_by_dimension3(room, direction, delta, updated_walls, metadata, rounding, round_results=False):
+    _shift_parallel_walls(room, direction, delta, updated_walls, metadata, rounding, round_results)
+
+def update_shifts_based_on_wall_availability(unshifted_room, shifted_room, direction, length, updated_walls, metadata, overlap, constraints, rounding, round_results=False):
+    logger.debug("Processing shift for rooms: Unshifted - %s, Shifted - %s, Direction - %s, Length - %s, Overlap - %s",
+                 unshifted_room, shifted_room, direction, length, overlap)
+    if overlap:
+        update_wall_length_by_dimension3(shifted_room, direction, -(length), updated_walls, metadata, rounding, round_results)
+    else:
+        # First, try to update the unshifted room if the direction is free
+        if is_direction_free(unshifted_room, direction, metadata):
+            update_wall_length_by_dimension2(unshifted_room, direction, length, updated_walls, metadata, constraints, rounding, round_results)
+        else:
+            # If not free, check the shifted room in the opposite direction
+            opp_direction = opposite_direction(direction)
+            if is_direction_free(shifted_room, opp_direction, metadata):
+                update_wall_length_by_dimension2(shifted_room, opp_direction, length, updated_walls, metadata, constraints, rounding, round_results)
+            else:
+                logger.debug("No available directions to shift walls for room pair (%s, %s)", unshifted_room, shifted_room)
+
+def stichFloorplan(shift_analysis_dict, metadata, overlap, constraints, rounding, round_results=False):
+    count('stitched_pairs', len(shift_analysis_dict))
+    updated_walls = set()
+    for room_pair, shift_details in shift_analysis_dict.items():
+        unshifted_room = shift_details['Unshifted Room']
+        for room, details in shift_details['Shifted'].items():
+            if details:  # Ensuring that there is a shift specified for the room
+                update_shifts_based_on_wall_availability(unshifted_room, room, details.direction.value, details.length, updated_walls, metadata, overlap, constraints, rounding, round_results)
+
+    updated_rooms = {room: [data['coordinates'] for wall_id, data in walls.items()] for room, walls in metadata.items()}
+    return updated_rooms
+
+def make_shift_analysis_dict(broken_connections, updated_rooms, rooms, rounding, round_results=False):
+    shift_analysis_dict = {}
+    # Centroid shifts of every room in a broken connection, computed in one batch
+    shifted_names = list(dict.fromkeys(room for room_pair in broken_connections for room in room_pair if room in rooms and room in updated_rooms))
+    shift_details, center_shifts = analyze_room_shifts(rooms, updated_rooms, shifted_names, ARRAY_ROUNDING[rounding], round_centroids=round_results)
+    shift_length = rounding if round_results else float
+    for room_pair in broken_connections:
+        room1, room2 = room_pair
+
+        if room1 in rooms and room1 in updated_rooms and room2 in rooms and room2 in updated_rooms:
+            direction1, length1 = shift_details[room1]
+            direction2, length2 = shift_details[room2]
+
+            shifted_dict = {
+                room1: ShiftRecord(room1, ShiftDirection(direction1), shift_length(length1)) if length1 > 0 else None,
+                room2: ShiftRecord(room2, ShiftDirection(direction2), shift_length(length2)) if length2 > 0 else None,
+            }
+
+            # Remove entries for unshifted rooms
+            shifted_dict = {k: v for k, v in shifted_dict.items() if v is not None}
+
+            # Handle overlapping case
+            if not shifted_dict:
+                nearest_distance, direction = find_nearest_walls(rooms[room1], rooms[room2], rounding, round_results)
+                if nearest_distance == 0:
+                    shifted_dict[room1] = ShiftRecord.overlapping(room1)
+                    shifted_dict[room2] = ShiftRecord.overlapping(room2)
+
+            unshifted_room, shifted_room = split_unshifted_room(room1, room2, center_shifts)
+            shift_analysis_dict[(room1, room2)] = {
+                'Unshifted Room': unshifted_room,
+                'Shifted': shifted_dict
+            }
+        else:
+            logger.debug("Missing data for %s or %s", room1, room2)
+
+    return shift_analysis_dict
+
+# Constraints and the area target
+def validate_room_dimensions(metadata, constraints, rounding, round_results=False):
+    validation_messages = []
+    for room, room_data in metadata.items():
+        width, height = calculate_dimensions_from_metadata(room_data, rounding, round_results)
+        room_constraints = constraints.get(room, UNCONSTRAINED)
+        if not (room_constraints.min_width <= width <= room_constraints.max_width):
+            validation_messages.append(f"{room}: Width {width:.2f} is out of bounds ({room_constraints.min_width}-{room_constraints.max_width}).")
+        if not (room_constraints.min_height <= height <= room_constraints.max_height):
+            validation_messages.append(f"{room}: Height {height:.2f} is out of bounds ({room_constraints.min_height}-{room_constraints.max_height}).")
+    return validation_messages
+
+def adjust_room_dimensions_to_meet_constraints(metadata, constraints, fixed_room_dimensions, updated_rooms, adjust_dimension, rounding, round_results=False, adjacency=None):
+    # Grows every room below its minimum with the engine's `adjust_dimension`;
+    # returns the adjacency graph of `updated_rooms`, so a caller can reuse it
+    excluded_rooms = {'MB Passage'}
+
+    adjusted_rooms = set()
+    if adjacency is None:
+        adjacency = AdjacencyGraph(updated_rooms)
+    for room, data in metadata.items():
+
+        if room not in fixed_room_dimensions and room not in adjusted_rooms and room_type(room) not in excluded_rooms:
+            current_width, current_height = calculate_dimensions_from_metadata(data, rounding, round_results)
+            room_constraints = constraints.get(room, UNCONSTRAINED)
+
+            # Determine how much to adjust dimensions
+            width_delta = max(0, room_constraints.min_width - current_width)
+            height_delta = max(0, room_constraints.min_height - current_height)
+
+            # Update dimensions if adjustments are needed
+            if width_delta > 0:
+                adjust_dimension(room, 'width', width_delta + current_width, metadata, updated_rooms, adjacency)
+            if height_delta > 0:
+                adjust_dimension(room, 'height', height_delta + current_height, metadata, updated_rooms, adjacency)
+    return adjacency
+
+def find_rooms_exceeding_min_constraints(metadata, constraints, fixed_room_dimensions, rounding, round_results=False):
+    excluded_rooms = {'MB Passage', 'Passage', 'Common Washroom', 'En suite Washroom'}
+    result = rounding if round_results else (lambda value: value)
+    exceeding_rooms = {}
+
+    for room, room_data in metadata.items():
+        if room not in fixed_room_dimensions and room_type(room) not in excluded_rooms:
+            width, height = calculate_dimensions_from_metadata(room_data, rounding, round_results)
+            min_width = constraints.get(room, UNCONSTRAINED).min_width
+            min_height = constraints.get(room, UNCONSTRAINED).min_height
+
+            if width > min_width or height > min_height:
+                exceeding_rooms[room] = {
+                    'exceeds_min_width_by': result(width - min_width) if width > min_width else 0,
+                    'exceeds_min_height_by': result(height - min_height) if height > min_height else 0
+                }
+
+    return exceeding_rooms
+
+def adjust_extra_area(metadata, constraints, fixed_room_dimensions, target_total_area, update_wall_length, rounding, round_results=False):
+    # The 'heuristic' area solver: spreads the area still missing (or over) across
+    # the living rooms, resizing each with the engine's `update_wall_length`
+    allowed_rooms = {'Master Bedroom', 'Living Room', 'Dining Room', 'Kitchen', 'Bedroom'}
+    result = rounding if round_results else (lambda value: value)
+    current_total_area = calculate_total_area(metadata)
+    area_difference = target_total_area - current_total_area
+
+    logger.debug("Initial total area: %s, Target total area: %s", current_total_area, target_total_area)
+    if area_difference == 0:
+        logger.debug("Exact match; no adjustment needed.")
+        return metadata
+
+    priority_order = {'Living Room': 1, 'Dining Room': 2, 'Kitchen': 3, 'Bedroom': 4}
+    adjustment_needed = []
+
+    for room, data in sorted(metadata.items(), key=lambda item: priority_order.get(room_type(item[0]), float('inf'))):
+        if room in fixed_room_dimensions or room_type(room) not in allowed_rooms or room not in constraints:
+            continue
+
+        width, height = calculate_dimensions_from_metadata(data, rounding, round_results)
+        room_excess = {
+            'width_excess': result(width - constraints[room].min_width),
+            'height_excess': result(height - constraints[room].min_height)
+        }
+
+        if area_difference > 0:
+            proportionate_width = width / (width + height) * area_difference
+            proportionate_height = height / (width + height) * area_difference
+            new_width = max(min(width + proportionate_width, constraints[room].max_width), constraints[room].min_width)
+            new_height = max(min(height + proportionate_height, constraints[room].max_height), constraints[room].min_height)
+            adjustment_needed.append({
+                'room': room,
+                'increase': True,
+                'width': width,
+                'height': height,
+                'adjust_width': result(new_width - width),
+                'adjust_height': result(new_height - height)
+            })
+
+        elif area_difference < 0 and (room_excess['width_excess'] > 0 or room_excess['height_excess'] > 0):
+            width_decrease = min(abs(area_difference), room_excess['width_excess']) if room_excess['width_excess'] > 0 else 0
+            height_decrease = min(abs(area_difference), room_excess['height_excess']) if room_excess['height_excess'] > 0 else 0
+
+            new_width = max(width - width_decrease, constraints[room].min_width)
+            new_height = max(height - height_decrease, constraints[room].min_height)
+
+            adjustment_needed.append({
+                'room': room,
+                'increase': False,
+                'width': width,
+                'height': height,
+                'width_decrease': result(width - new_width),
+                'height_decrease': result(height - new_height)
+            })
+
+    total_adjustment = sum([abs(info['adjust_width'] * info['height'] + info['adjust_height'] * info['width'])
+                            if info['increase'] else (info['width_decrease'] * info['height'] + info['height_decrease'] * info['width'])
+                            for info in adjustment_needed])
+    adjustment_factor = abs(area_difference) / total_adjustment if total_adjustment != 0 else 0
+
+    for adjust_info in adjustment_needed:
+        room = adjust_info['room']
+        if adjust_info['increase']:
+            adjust_width = adjust_info['adjust_width'] * adjustment_factor
+            adjust_height = adjust_info['adjust_height'] * adjustment_factor
+            new_width = max(adjust_info['width'] + adjust_width, constraints[room].min_width)
+            new_height = max(adjust_info['height'] + adjust_height, constraints[room].min_height)
+
+            width_updated = False
+            height_updated = False
+
+            # Check if direction for width is free
+            if adjust_width > 0:
+                for direction in ['East', 'West']:
+                    if is_direction_free(room, direction, metadata):
+                        update_wall_length(room, 'width', new_width, metadata)
+                        width_updated = True
+                        area_difference -= (adjust_width * adjust_info['height'])
+                        break
+
+            # Check if direction for height is free
+            if adjust_height > 0:
+                for direction in ['North', 'South']:
+                    if is_direction_free(room, direction, metadata):
+                        update_wall_length(room, 'height', new_height, metadata)
+                        height_updated = True
+                        area_difference -= (adjust_height * adjust_info['width'])
+                        break
+
+            if not width_updated:
+                area_difference += adjust_width * adjust_info['height']
+            if not height_updated:
+                area_difference += adjust_height * adjust_info['width']
+
+        else:
+            width_decrease = adjust_info['width_decrease']
+            height_decrease = adjust_info['height_decrease']
+            width_decrease_adjusted = width_decrease * adjustment_factor
+            height_decrease_adjusted = height_decrease * adjustment_factor
+            new_width = max(adjust_info['width'] - width_decrease_adjusted, constraints[room].min_width)
+            new_height = max(adjust_info['height'] - height_decrease_adjusted, constraints[room].min_height)
+
+            if new_width < constraints[room].min_width:
+                width_decrease_adjusted = width_decrease
+                new_width = constraints[room].min_width
+
+            if new_height < constraints[room].min_height:
+                height_decrease_adjusted = height_decrease
+                new_height = constraints[room].min_height
+
+            width_updated = False
+            height_updated = False
+
+            # Check if direction for width is free
+            if width_decrease > 0:
+                for direction in ['East', 'West']:
+                    if is_direction_free(room, direction, metadata):
+                        update_wall_length(room, 'width', new_width, metadata)
+                        width_updated = True
+                        area_difference += (width_decrease_adjusted * adjust_info['height'])
+                        break
+
+            # Check if direction for height is free
+            if height_decrease > 0:
+                for direction in ['North', 'South']:
+                    if is_direction_free(room, direction, metadata):
+                        update_wall_length(room, 'height', new_height, metadata)
+                        height_updated = True
+                        area_difference += (height_decrease_adjusted * adjust_info['width'])
+                        break
+
+            if not width_updated:
+                area_difference -= width_decrease_adjusted * adjust_info['height']
+            if not height_updated:
+                area_difference -= height_decrease_adjusted * adjust_info['width']
+
+    if abs(area_difference) > 3:
+        logger.debug("Extra area left over after adjustment: %s", area_difference)
+    else:
+        logger.debug("Reached target area approximately")
+
+    return metadata
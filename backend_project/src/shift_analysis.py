@@ -0,0 +1,144 @@
+from enum import Enum
+
+import numpy as np
+
+
+class ShiftDirection(Enum):
+    # Way a room's centroid moved between two plans; OVERLAP marks a broken
+    # connection between rooms that did not move but now touch or overlap
+    NONE = ''
+    EAST = 'East'
+    WEST = 'West'
+    NORTH = 'North'
+    SOUTH = 'South'
+    EAST_NORTH = 'EastNorth'
+    EAST_SOUTH = 'EastSouth'
+    WEST_NORTH = 'WestNorth'
+    WEST_SOUTH = 'WestSouth'
+    OVERLAP = 'Overlap'
+
+    @classmethod
+    def from_vector(cls, dx, dy):
+        return cls(('East' if dx > 0 else 'West' if dx < 0 else '') + ('North' if dy > 0 else 'South' if dy < 0 else ''))
+
+
+class ShiftRecord:
+    """How far one room of a broken connection moved, and which way.
+
+    make_shift_analysis_dict builds these and stichFloorplan reads `direction`
+    and `length` straight off them.
+    """
+
+    __slots__ = ('room', 'direction', 'length', 'overlap')
+
+    def __init__(self, room, direction, length, overlap=False):
+        self.room = room
+        self.direction = direction
+        self.length = length
+        self.overlap = overlap
+
+    @classmethod
+    def overlapping(cls, room):
+        return cls(room, ShiftDirection.OVERLAP, 0.0, overlap=True)
+
+    def __eq__(self, other):
+        if not isinstance(other, ShiftRecord):
+            return NotImplemented
+        return (self.room, self.direction, self.length, self.overlap) == (other.room, other.direction, other.length, other.overlap)
+
+    def __repr__(self):
+        return f"ShiftRecord({self.room!r}, {self.direction.value!r}, {self.length}, overlap={self.overlap})"
+
+
+def _norms(vectors):
+    # Length of every vector along the last axis. Matches np.linalg.norm on each
+    # vector bit for bit; a plain sum of squares can differ in the last place.
+    return np.sqrt(np.matmul(vectors[..., None, :], vectors[..., :, None])[..., 0, 0])
+
+
+def _room_points(rooms, names):
+    # Endpoints of the named rooms, stacked per point count: [(positions, (k, n, 2) array)]
+    groups = {}
+    for position, room in enumerate(names):
+        points = [point for wall in rooms[room] for point in wall]
+        groups.setdefault(len(points), ([], []))
+        groups[len(points)][0].append(position)
+        groups[len(points)][1].append(points)
+    return [(positions, np.array(points, dtype=float)) for positions, points in groups.values()]
+
+
+def _centroids(rooms, names):
+    # Two means per room: `centroids` averages x and y separately as calculate_centroid
+    # does, `centers` averages the (x, y) points. NumPy sums them in a different
+    # order, so both are kept to reproduce the earlier per-room results exactly.
+    centroids = np.empty((len(names), 2))
+    centers = np.empty((len(names), 2))
+    for positions, points in _room_points(rooms, names):
+        centroids[positions] = np.ascontiguousarray(points.transpose(0, 2, 1)).mean(axis=2)
+        centers[positions] = points.mean(axis=1)
+    return centroids, centers
+
+
+def analyze_room_shifts(rooms, updated_rooms, names, rounding, round_centroids=False):
+    """Shift details for every room in `names` between two plans, in one batch.
+
+    Returns ({room: (direction, length)}, {room: center shift}). The first matches
+    get_shift_details for each room and the second the distance between the
+    mean points of the room, which split_unshifted_room compares. `rounding` is applied element-wise to
+    the lengths, and to the centroids as well when `round_centroids` is set.
+    """
+    if not names:
+        return {}, {}
+    original_centroids, original_centers = _centroids(rooms, names)
+    updated_centroids, updated_centers = _centroids(updated_rooms, names)
+    if round_centroids:
+        original_centroids = rounding(original_centroids)
+        updated_centroids = rounding(updated_centroids)
+
+    shift_vectors = updated_centroids - original_centroids
+    lengths = rounding(_norms(shift_vectors)).tolist()
+    center_shifts = _norms(updated_centers - original_centers).tolist()
+
+    details = {}
+    for room, (dx, dy), length in zip(names, shift_vectors.tolist(), lengths):
+        details[room] = (ShiftDirection.from_vector(dx, dy).value, length)
+    return details, dict(zip(names, center_shifts))
+
+
+def split_unshifted_room(room1, room2, center_shifts):
+    # (unshifted, shifted) for a pair of rooms: the one whose center moved less is unshifted
+    if center_shifts[room1] > center_shifts[room2]:
+        return room2, room1
+    elif center_shifts[room2] > center_shifts[room1]:
+        return room1, room2
+    else:
+        return 'None or Both', 'None or Both'
+
+
+def nearest_walls(walls1, walls2, rounding=None):
+    """(distance, direction) of the closest endpoints of two rooms' walls.
+
+    All endpoint distances are computed at once by broadcasting. Ties resolve to
+    the first wall pair and endpoint pair in the order find_nearest_walls scans
+    them; with `rounding`, wall pairs are compared on rounded distances.
+    """
+    if not walls1 or not walls2:
+        return float('inf'), None
+    points1 = np.array(walls1, dtype=float)
+    points2 = np.array(walls2, dtype=float)
+    differences = points1[:, None, :, None, :] - points2[None, :, None, :, :]
+    distances = _norms(differences).reshape(len(walls1), len(walls2), 4)
+
+    closest = distances.argmin(axis=2)
+    pair_distances = np.take_along_axis(distances, closest[..., None], axis=2)[..., 0]
+    if rounding is not None:
+        pair_distances = rounding(pair_distances)
+    i, j = np.unravel_index(pair_distances.argmin(), pair_distances.shape)
+    a, b = divmod(int(closest[i, j]), 2)
+    (x1, y1), (x2, y2) = walls1[i][a], walls2[j][b]
+
+    if abs(x1 - x2) > abs(y1 - y2):
+        direction = 'East' if x1 < x2 else 'West'
+    else:
+        direction = 'North' if y1 < y2 else 'South'
+    return float(pair_distances[i, j]), direction
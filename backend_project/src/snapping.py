@@ -0,0 +1,139 @@
+import numpy as np
+
+
+def _first_index(low, high, predicate):
+    # First index in [low, high) where the monotone predicate becomes true
+    while low < high:
+        mid = (low + high) // 2
+        if predicate(mid):
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+
+def cluster_near_values(values, threshold=0.9):
+    """Group values exactly like group_near_values, in O(n log n).
+
+    Values are taken as bases in the given order and each base claims every value
+    not yet grouped that lies within `threshold` of it. The values are sorted once;
+    each base finds its window with two binary searches and walks only the values
+    still unclaimed in it, skipping claimed ones through path-compressed pointers.
+    Returns a list of (base, members) tuples in the order the groups are formed.
+    """
+    sorted_values = sorted(values)
+    position = {value: i for i, value in enumerate(sorted_values)}
+    n = len(sorted_values)
+    next_unclaimed = list(range(n + 1))
+
+    def find(i):
+        root = i
+        while next_unclaimed[root] != root:
+            root = next_unclaimed[root]
+        while next_unclaimed[i] != root:
+            next_unclaimed[i], i = root, next_unclaimed[i]
+        return root
+
+    groups = []
+    for base in values:
+        i = position[base]
+        if find(i) != i:
+            continue
+        low = _first_index(0, i, lambda k: abs(base - sorted_values[k]) < threshold)
+        high = _first_index(i, n, lambda k: not abs(base - sorted_values[k]) < threshold)
+        members = []
+        k = find(low)
+        while k < high:
+            members.append(sorted_values[k])
+            next_unclaimed[k] = k + 1
+            k = find(k + 1)
+        groups.append((base, members))
+    return groups
+
+
+def build_snap_table(values, threshold=0.9, transform=None):
+    """Map every value to the value replace_near_values writes in its place.
+
+    Each value becomes the base of its group. When `transform` (e.g. truncation)
+    turns that base into a value belonging to a later group, the old per-group
+    replacement loop would have rewritten it again, so the chain is followed here.
+    """
+    groups = cluster_near_values(values, threshold)
+    group_index = {}
+    for index, (base, members) in enumerate(groups):
+        for value in members:
+            group_index[value] = index
+
+    snapped = [None] * len(groups)
+    for index in range(len(groups) - 1, -1, -1):
+        base = groups[index][0]
+        new_value = transform(base) if transform else base
+        later = group_index.get(new_value)
+        snapped[index] = snapped[later] if later is not None and later > index else new_value
+    return {value: snapped[index] for value, index in group_index.items()}
+
+
+def snap_near_values(rooms, threshold=0.9, transform=None):
+    all_values = []
+    for coordinates in rooms.values():
+        for line in coordinates:
+            for point in line:
+                all_values.append(point[0])
+                all_values.append(point[1])
+
+    # Groups are seeded in set iteration order
+    snap_table = build_snap_table(list(set(all_values)), threshold, transform)
+
+    for coordinates in rooms.values():
+        for line in coordinates:
+            for point in line:
+                point[0] = snap_table[point[0]]
+                point[1] = snap_table[point[1]]
+    return rooms
+
+
+def _cluster_ids(sorted_values, threshold):
+    # Cluster number of every sorted value. A cluster starts at the first value
+    # not yet taken and takes the values less than `threshold` above it, so no
+    # cluster spans `threshold` however densely the values are packed.
+    ids = np.empty(len(sorted_values), dtype=np.intp)
+    start = cluster = 0
+    while start < len(sorted_values):
+        end = int(np.searchsorted(sorted_values, sorted_values[start] + threshold, side='left'))
+        end = max(end, start + 1)
+        ids[start:end] = cluster
+        start = end
+        cluster += 1
+    return ids
+
+
+def merge_near_coordinates(rooms, threshold=0.2, transform=None):
+    """Merge endpoint coordinates that lie within `threshold` of each other.
+
+    All endpoints are packed into an (N, 2) array. Per axis the values are sorted
+    and grouped into clusters spanning less than `threshold` (see _cluster_ids),
+    and every cluster with more than one value is replaced by its mean, passed
+    through `transform` (round to two decimals by default). Values with no near
+    neighbour are left untouched.
+    """
+    if transform is None:
+        transform = lambda value: round(value, 2)
+
+    points = [point for shapes in rooms.values() for shape in shapes for point in shape]
+    if not points:
+        return rooms
+    coords = np.array(points, dtype=float)
+
+    for axis in (0, 1):
+        values = coords[:, axis]
+        order = np.argsort(values, kind='stable')
+        sorted_values = values[order]
+        run_ids = _cluster_ids(sorted_values, threshold)
+        run_sizes = np.bincount(run_ids)
+        run_means = np.bincount(run_ids, weights=sorted_values) / run_sizes
+
+        merged = order[run_sizes[run_ids] > 1]
+        new_values = run_means[run_ids[run_sizes[run_ids] > 1]]
+        for i, value in zip(merged.tolist(), new_values.tolist()):
+            points[i][axis] = transform(value)
+    return rooms
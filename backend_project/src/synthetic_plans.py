@@ -0,0 +1,73 @@
+# Synthetic whole-floor plans for scaling tests. The shipped templates have 5-10
+# rooms each, so the parts of the engines that grow with the square (or worse)
+# of the room count never show up in the benchmark. `synthetic_floor` lays
+# copies of the templates out side by side into one floor of many flats, each
+# copy stretched by a small random factor, and returns it in the engines'
+# {room: [[[x, y], [x, y]], ...]} format.
+#
+# Every room gets the number of its flat as its unit (see room_ids.py):
+# 'Kitchen' in the third flat becomes 'Kitchen#3'.
+import random
+
+from src.room_ids import make_room_id
+
+
+def plan_bounds(rooms):
+    xs = [x for walls in rooms.values() for wall in walls for x, y in wall]
+    ys = [y for walls in rooms.values() for wall in walls for x, y in wall]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def plan_area(rooms):
+    # Sum of the rooms' bounding boxes, the area the engines work with for rectangular rooms
+    total = 0.0
+    for walls in rooms.values():
+        xs = [x for wall in walls for x, y in wall]
+        ys = [y for wall in walls for x, y in wall]
+        total += (max(xs) - min(xs)) * (max(ys) - min(ys))
+    return total
+
+
+def place_flat(rooms, origin, stretch=(1.0, 1.0), unit=None):
+    """A copy of `rooms` with its lower left corner moved to `origin`.
+
+    The copy is stretched by `stretch` = (sx, sy) about that corner, which keeps
+    shared walls shared, and every room is given `unit`.
+    """
+    min_x, min_y, _, _ = plan_bounds(rooms)
+    sx, sy = stretch
+    ox, oy = origin
+    placed = {}
+    for room, walls in rooms.items():
+        placed[make_room_id(room, unit)] = [
+            [[round(ox + (x - min_x) * sx, 2), round(oy + (y - min_y) * sy, 2)] for x, y in wall]
+            for wall in walls
+        ]
+    return placed
+
+
+def synthetic_floor(templates, flats, columns=None, jitter=0.1, seed=0):
+    """A floor of `flats` flats built from `templates`, a list of room dicts.
+
+    Templates are drawn at random (with `seed`), each stretched on both axes by
+    a factor within 1 +/- `jitter`, and laid out in rows of `columns` flats
+    (about a square grid by default) that touch their neighbours.
+    """
+    if flats < 1:
+        raise ValueError("A synthetic floor needs at least one flat.")
+    if not templates:
+        raise ValueError("No templates to build a synthetic floor from.")
+    rng = random.Random(seed)
+    columns = columns or max(1, round(flats ** 0.5))
+
+    floor = {}
+    x = y = row_height = 0.0
+    for flat in range(flats):
+        if flat and flat % columns == 0:
+            x, y, row_height = 0.0, y + row_height, 0.0
+        stretch = (rng.uniform(1 - jitter, 1 + jitter), rng.uniform(1 - jitter, 1 + jitter))
+        placed = place_flat(rng.choice(templates), (x, y), stretch, unit=flat + 1)
+        _, _, max_x, max_y = plan_bounds(placed)
+        x, row_height = max_x, max(row_height, max_y - y)
+        floor.update(placed)
+    return floor
@@ -0,0 +1,62 @@
+# Tracing for the floor plan engines, on top of the standard logging module.
+# Each engine logs to its own logger ('src.test_area', 'src.adjust_dimension',
+# 'src.new_room_placement'), all under 'src':
+#   DEBUG    every solver step (walls moved, rooms shifted, shift analysis)
+#   INFO     one line per pipeline stage with its elapsed time (see `span`)
+#   WARNING  requests the solver could not fully satisfy
+# Nothing is written unless the 'src' logger is enabled for the level, e.g.
+# through LOGGING in the Django settings. Log calls pass their values as
+# arguments so the message is only formatted when it is emitted, and values
+# that are costly to compute are guarded with `logger.isEnabledFor`. Spans also
+# feed the per-request stage timers of metrics.py.
+import logging
+import time
+from contextlib import nullcontext
+
+from src.metrics import current_metrics
+
+_NO_SPAN = nullcontext()
+
+
+class Span:
+    """Times one pipeline stage; logs it at INFO and adds it to `metrics` when it ends.
+
+    The stage name and elapsed milliseconds are attached to the log record as
+    `span` and `elapsed_ms` for structured formatters, together with any
+    extra fields given to `span`.
+    """
+
+    __slots__ = ('logger', 'name', 'fields', 'metrics', 'log', 'start')
+
+    def __init__(self, logger, name, fields, metrics, log):
+        self.logger = logger
+        self.name = name
+        self.fields = fields
+        self.metrics = metrics
+        self.log = log
+        self.start = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        if self.metrics is not None:
+            self.metrics.add_stage(self.name, elapsed)
+        if not self.log:
+            return False
+        elapsed_ms = elapsed * 1000
+        outcome = 'failed' if exc_type is not None else 'done'
+        self.logger.info('%s %s in %.2f ms', self.name, outcome, elapsed_ms,
+                         extra={'span': self.name, 'elapsed_ms': elapsed_ms, **self.fields})
+        return False
+
+
+def span(logger, name, **fields):
+    # A no-op context manager when INFO is off and no metrics are being collected
+    metrics = current_metrics()
+    log = logger.isEnabledFor(logging.INFO)
+    if not log and metrics is None:
+        return _NO_SPAN
+    return Span(logger, name, fields, metrics, log)
@@ -0,0 +1,24 @@
+# Debug helpers for notebooks and local runs. matplotlib is only imported when
+# one of these is called, so the request path never loads it.
+
+
+# Function to plot the new floor plan
+def plot_floor_plan(rooms, title='Scaled Floor Plan', fontsize=8):
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots()
+    for room, coordinates in rooms.items():
+        for line in coordinates:
+            (x1, y1), (x2, y2) = line
+            ax.plot([x1, x2], [y1, y2])
+        # Add room label
+        centroid_x = sum([line[0][0] for line in coordinates]) / 4
+        centroid_y = sum([line[0][1] for line in coordinates]) / 4
+        ax.text(centroid_x, centroid_y, room, ha='center', va='center', fontsize=fontsize)
+    ax.set_aspect('equal')
+    plt.xlabel('X Coordinate')
+    plt.ylabel('Y Coordinate')
+    plt.title(title)
+    plt.grid(True)
+    plt.show()
+
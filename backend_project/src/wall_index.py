@@ -0,0 +1,121 @@
+from bisect import bisect_left, insort
+
+from src.metrics import count
+
+
+def _wall_entries(coords):
+    (x1, y1), (x2, y2) = coords[0], coords[1]
+    # Zero-length walls behave like both a vertical and a horizontal one in check_overlap
+    if x1 == x2:
+        yield 'vertical', x1, min(y1, y2), max(y1, y2)
+    if y1 == y2:
+        yield 'horizontal', y1, min(x1, x2), max(x1, x2)
+
+
+class WallIndex:
+    """Axis-aligned wall segments bucketed by their fixed coordinate.
+
+    Horizontal walls are keyed by y and vertical walls by x. Each bucket keeps its
+    intervals sorted by start together with a running maximum of the interval ends,
+    so an overlap query only walks the intervals that can actually reach it.
+
+    `rooms` maps a room to its walls, either as a list (walls are keyed by position)
+    or as a {wall_id: coords} dict. `comparisons` counts the intervals queries
+    have looked at, for the solver metrics.
+    """
+
+    def __init__(self, rooms=None):
+        self._buckets = {'horizontal': {}, 'vertical': {}}
+        self.comparisons = 0
+        for room, walls in (rooms or {}).items():
+            items = walls.items() if isinstance(walls, dict) else enumerate(walls)
+            for key, coords in items:
+                for wall_type, line, low, high in _wall_entries(coords):
+                    self._buckets[wall_type].setdefault(line, [[], []])[0].append((low, high, room, key))
+        for lines in self._buckets.values():
+            for bucket in lines.values():
+                bucket[0].sort()
+                self._refresh_bucket(bucket)
+
+    @staticmethod
+    def _refresh_bucket(bucket):
+        intervals = bucket[0]
+        running_max = []
+        current_max = float('-inf')
+        for interval in intervals:
+            current_max = max(current_max, interval[1])
+            running_max.append(current_max)
+        bucket[1] = running_max
+
+    def add(self, coords, room, key=None):
+        for wall_type, line, low, high in _wall_entries(coords):
+            bucket = self._buckets[wall_type].setdefault(line, [[], []])
+            insort(bucket[0], (low, high, room, key))
+            self._refresh_bucket(bucket)
+
+    def remove(self, coords, room, key=None):
+        for wall_type, line, low, high in _wall_entries(coords):
+            bucket = self._buckets[wall_type][line]
+            bucket[0].remove((low, high, room, key))
+            if bucket[0]:
+                self._refresh_bucket(bucket)
+            else:
+                del self._buckets[wall_type][line]
+
+    def _overlapping(self, wall_type, line, low, high, room_name):
+        bucket = self._buckets[wall_type].get(line)
+        if bucket is None:
+            return
+        intervals, running_max = bucket
+        # Only intervals starting before `high` can overlap (low, high)
+        i = bisect_left(intervals, (high,)) - 1
+        while i >= 0 and running_max[i] > low:
+            self.comparisons += 1
+            start, end, room, key = intervals[i]
+            if end > low and room != room_name:
+                yield room, key
+            i -= 1
+
+    def overlapping(self, coords, room_name):
+        # (room, key) of every wall of another room sharing a stretch of `coords`
+        for wall_type, line, low, high in _wall_entries(coords):
+            yield from self._overlapping(wall_type, line, low, high, room_name)
+
+    def is_free(self, coords, room_name):
+        # Same answer as is_wall_free(coords, room_name, rooms) without scanning every wall
+        return next(self.overlapping(coords, room_name), None) is None
+
+    def take_comparisons(self):
+        # Comparisons since the last call
+        comparisons, self.comparisons = self.comparisons, 0
+        return comparisons
+
+
+def find_common_walls(room_data):
+    """{(room1, room2): [(line1, line2), ...]} for every pair of rooms sharing a wall.
+
+    Rooms and lines keep their order in `room_data`, so the result matches a
+    pairwise comparison of all lines with is_overlapping_or_touching1, but each
+    line only meets the walls lying on its own x or y line. Zero-length lines never
+    share a wall under that test, so they are left out of the index.
+    """
+    lines_by_room = {
+        room: {i: line for i, line in enumerate(lines) if tuple(line[0]) != tuple(line[1])}
+        for room, lines in room_data.items()
+    }
+    index = WallIndex(lines_by_room)
+    room_order = {room: i for i, room in enumerate(room_data)}
+    shared = {}
+    for room1, lines in lines_by_room.items():
+        for i, line1 in lines.items():
+            for room2, j in set(index.overlapping(line1, room1)):
+                if room_order[room2] > room_order[room1]:
+                    shared.setdefault((room_order[room1], room_order[room2]), []).append((i, j))
+
+    room_names = list(room_data)
+    common_walls_info = {}
+    for (order1, order2), pairs in sorted(shared.items()):
+        room1, room2 = room_names[order1], room_names[order2]
+        common_walls_info[(room1, room2)] = [(room_data[room1][i], room_data[room2][j]) for i, j in sorted(pairs)]
+    count('wall_comparisons', index.comparisons)
+    return common_walls_info